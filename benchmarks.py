@@ -0,0 +1,218 @@
+"""
+Performance benchmarks for the evaluator, equity engine, strategies and
+the betting loop.
+
+Results are written as JSON so runs can be saved and compared:
+
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --compare baseline.json
+
+Every result records its unit and whether higher is better; --compare flags
+any result that moved the wrong way by more than --tolerance and exits
+non-zero if it finds one.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from deck import PokerHandEvaluator
+from equity_cache import shared_cache
+from events import NullSink
+from logic import GameState, PokerBot
+from main import create_bots, play_hand
+from mechanics import PokerDeck
+from strategies import AggressiveStrategy, AllIn, BucketStrategy, ConservativeStrategy, RandomStrategy
+
+STREETS = {'flop': 3, 'turn': 4, 'river': 5}
+SAMPLE_COUNTS = [250, 1000, 5000]
+
+
+def measure(func, min_time=0.3, repeats=3):
+    """
+    Calls `func` repeatedly for at least `min_time` seconds, `repeats` times,
+    and returns the best average seconds per call.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def random_spots(count, board_size, seed=0):
+    """Returns `count` (hand, board) pairs dealt from shuffled decks."""
+    rng = random.Random(seed)
+    spots = []
+    for _ in range(count):
+        cards = rng.sample(range(52), 2 + board_size)
+        spots.append((cards[:2], cards[2:]))
+    return spots
+
+
+def bench_evaluator(results):
+    evaluator = PokerHandEvaluator()
+    spots = random_spots(1000, 5)
+
+    def evaluate_all():
+        for hand, board in spots:
+            evaluator.evaluate_hand(hand, board)
+
+    def best_five_all():
+        for hand, board in spots:
+            evaluator.determine_best_five(hand + board)
+
+    results['evaluate_hand'] = (len(spots) / measure(evaluate_all), 'evals/s', True)
+    results['determine_best_five'] = (len(spots) / measure(best_five_all), 'evals/s', True)
+
+
+def bench_equity(results):
+    evaluator = PokerHandEvaluator(np.random.default_rng(0))
+    for street, board_size in STREETS.items():
+        hand, board = random_spots(1, board_size, seed=board_size)[0]
+        for samples in SAMPLE_COUNTS:
+            seconds = measure(lambda: evaluator.monte_carlo_simulation(hand, board, samples, exact_budget=0))
+            results[f'monte_carlo.{street}.{samples}'] = (seconds * 1000, 'ms', False)
+        if street != 'flop':
+            seconds = measure(lambda: evaluator.monte_carlo_simulation(hand, board))
+            results[f'monte_carlo.{street}.exact'] = (seconds * 1000, 'ms', False)
+
+
+def bench_strategies(results):
+    spots = random_spots(60, 0, seed=1) + random_spots(60, 3, seed=2) + random_spots(60, 4, seed=3)
+    for strategy_class in (AggressiveStrategy, ConservativeStrategy, AllIn, RandomStrategy, BucketStrategy):
+        strategy = strategy_class()
+        strategy.sink = NullSink()
+        strategy.evaluator.rng = np.random.default_rng(0)
+        game_state = GameState()
+        game_state.bot = PokerBot("BenchBot", strategy, stack=2000)
+        game_state.pot = 100
+        game_state.minimum_bet = 10
+        game_state.num_opponents = 3
+
+        def decide_all():
+            shared_cache.clear()  # Measure real decisions, not cache hits
+            for hand, board in spots:
+                game_state.community_cards = board
+                strategy.decide(game_state, hand)
+
+        results[f'decide.{strategy_class.__name__}'] = (len(spots) / measure(decide_all), 'decisions/s', True)
+
+        game_states = []
+        for hand, board in spots:
+            batch_state = GameState(board)
+            batch_state.bot = PokerBot("BenchBot", strategy, stack=2000)
+            batch_state.bot.hand = hand
+            batch_state.pot = 100
+            batch_state.minimum_bet = 10
+            batch_state.num_opponents = 3
+            game_states.append(batch_state)
+
+        def decide_batch():
+            shared_cache.clear()
+            strategy.decide_batch(game_states)
+
+        results[f'decide_batch.{strategy_class.__name__}'] = (len(spots) / measure(decide_batch), 'decisions/s', True)
+
+
+def bench_hands(results, num_hands=100):
+    sink = NullSink()
+    evaluator = PokerHandEvaluator()
+
+    def play_hands():
+        random.seed(0)
+        shared_cache.clear()
+        bots = create_bots()
+        for bot in bots:
+            bot.strategy.sink = sink
+            bot.strategy.evaluator.rng = np.random.default_rng(0)
+        deck = PokerDeck(rng=random.Random(0))
+        deck.shuffle()
+        for hand_number in range(num_hands):
+            for bot in bots:
+                bot.stack = 2000
+                bot.reset_bet()
+            deck.reset()
+            play_hand(deck, bots, evaluator, hand_number % len(bots), sink)
+
+    results['play_hand'] = (num_hands / measure(play_hands, repeats=2), 'hands/s', True)
+
+
+BENCHMARKS = {
+    'evaluator': bench_evaluator,
+    'equity': bench_equity,
+    'strategies': bench_strategies,
+    'hands': bench_hands,
+}
+
+
+def run_benchmarks(groups=None):
+    """Runs the selected benchmark groups and returns the JSON-ready report."""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if groups is None or name in groups:
+            bench(results)
+
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': {name: {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+                    for name, (value, unit, higher_is_better) in results.items()},
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Prints every result next to its baseline and returns the names of the
+    results that regressed by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<36}{result['value']:>14.2f} {result['unit']:<12} (new)")
+            continue
+
+        change = (result['value'] - base['value']) / base['value']
+        worse = -change if result['higher_is_better'] else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<36}{result['value']:>14.2f} {result['unit']:<12}{change:>+9.1%}  {flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument('--groups', nargs='*', choices=list(BENCHMARKS), help="benchmark groups to run")
+    parser.add_argument('--save', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="compare against a saved JSON baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.groups)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+    else:
+        for name, result in report['results'].items():
+            print(f"{name:<36}{result['value']:>14.2f} {result['unit']}")
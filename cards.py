@@ -0,0 +1,46 @@
+"""
+Compact card representation shared by the deck, bots, strategies and evaluator.
+
+A card is a plain int from 0 to 51 laid out as ``rank * 4 + suit``, so the rank
+and suit can be read back with a shift and a mask. Strings such as
+"10 of Hearts" are only produced at the display edges.
+"""
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+# Every card in the same order the old string deck was built in
+DECK = [rank * 4 + suit for suit in range(len(SUITS)) for rank in range(len(RANKS))]
+
+CARD_STRINGS = [f"{RANKS[card >> 2]} of {SUITS[card & 3]}" for card in range(52)]
+STRING_TO_CARD = {text: card for card, text in enumerate(CARD_STRINGS)}
+
+
+def make_card(rank, suit):
+    """Builds a card from a rank index (0 = '2', 12 = 'A') and a suit index."""
+    return rank * 4 + suit
+
+
+def card_rank(card):
+    """Returns the rank index of a card (0 = '2', 12 = 'A')."""
+    return card >> 2
+
+
+def card_suit(card):
+    """Returns the suit index of a card (see SUITS)."""
+    return card & 3
+
+
+def card_to_str(card):
+    """Formats a card as 'Rank of Suit' for display."""
+    return CARD_STRINGS[card]
+
+
+def cards_to_str(cards):
+    """Formats a list of cards as a comma separated string for display."""
+    return ", ".join(CARD_STRINGS[card] for card in cards)
+
+
+def parse_card(text):
+    """Parses a 'Rank of Suit' string back into a card."""
+    return STRING_TO_CARD[text]
@@ -1,186 +1,118 @@
-from treys import Card, Evaluator
-from itertools import combinations
 import random
-
-class PokerDeck:
-    def __init__(self):
-        self.suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        self.ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        self.deck = self.create_deck()
-
-    def create_deck(self):
-        return [f"{rank} of {suit}" for suit in self.suits for rank in self.ranks]
-
-    def shuffle(self):
-        random.shuffle(self.deck)
-
-    def deal(self, num_cards):
-        if num_cards > len(self.deck):
-            raise ValueError("Not enough cards left in the deck to deal.")
-        return [self.deck.pop() for _ in range(num_cards)]
-
-
-# Precompute Card Map for Faster Conversion
-RANK_MAP = {'2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8',
-            '9': '9', '10': 'T', 'J': 'J', 'Q': 'Q', 'K': 'K', 'A': 'A'}
-
-SUIT_MAP = {'Hearts': 'h', 'Diamonds': 'd', 'Clubs': 'c', 'Spades': 's'}
-
-CARD_MAP = {f"{rank} of {suit}": f"{RANK_MAP[rank]}{SUIT_MAP[suit]}"
-            for rank in RANK_MAP for suit in SUIT_MAP}
-
+import numpy as np
+from equity import EXACT_BUDGET, batch_equity, sequential_equity
+from preflop import preflop_equity
+from ranges import range_equity
+import handrank
+from mechanics import PokerDeck, card_mask
 
 class PokerHandEvaluator:
-    def __init__(self):
-        self.evaluator = Evaluator()
+    """
+    Hand scoring and equity estimates. The lookup tables live in handrank and
+    are shared by the whole process, so an evaluator only carries its own
+    random generator and is cheap to create.
+    """
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
 
     def evaluate_hand(self, hand, community_cards):
-        treys_hand = [Card.new(card) for card in self.convert_to_treys(hand)]
-        treys_community = [Card.new(card) for card in self.convert_to_treys(community_cards)]
-
-        all_cards = treys_hand + treys_community
+        all_cards = hand + community_cards
 
         if len(all_cards) < 5:
             raise ValueError("Not enough cards to evaluate. At least 5 cards are required.")
 
-        score = self.evaluator.evaluate(treys_community, treys_hand)
-        return score
+        return handrank.evaluate(all_cards)
 
-    def convert_to_treys(self, cards):
-        """ Convert human-readable card format to Treys format using precomputed CARD_MAP. """
-        return [CARD_MAP[card] for card in cards]
+    def monte_carlo_simulation(self, hand, community_cards, num_simulations=1000, num_opponents=1, batch=True,
+                               exact_budget=EXACT_BUDGET, context=None):
+        """
+        Simulates future hands to estimate win probability.
+        By default all simulations run as one NumPy batch, and spots with no more
+        than `exact_budget` possible deals (turn and river) are enumerated exactly.
+        A HandContext for the same hand and board reuses its running state.
+        batch=False runs the original one-hand-at-a-time loop against a single opponent.
+        """
+        if context is not None:
+            return context.equity(num_opponents, num_simulations, self.rng, exact_budget)
+        if batch:
+            return batch_equity(hand, community_cards, num_opponents, num_simulations, self.rng, exact_budget)
 
-    def monte_carlo_simulation(self, hand, community_cards, num_simulations=1000):
-        """Simulates future hands to estimate win probability."""
         wins = 0
 
+        # One deck for the whole run, reset without the known cards each time
+        simulated_deck = PokerDeck(rng=random.Random(int(self.rng.integers(2 ** 63))))
+        simulated_deck.shuffle()
+        dead_mask = card_mask(hand + community_cards)
+        missing_cards = 5 - len(community_cards)
+
         for _ in range(num_simulations):
-            simulated_deck = PokerDeck()
-            simulated_deck.shuffle()
-
-            # Avoid using already dealt cards
-            used_cards = set(hand + community_cards)
-
-            # Generate missing community cards
-            missing_cards = 5 - len(community_cards)
-            simulated_board = community_cards[:]
-
-            while len(simulated_board) < 5:
-                card = simulated_deck.deal(1)[0]
-                if card not in used_cards:
-                    simulated_board.append(card)
-                    used_cards.add(card)
-
-            # Generate a valid opponent hand
-            opponent_hand = []
-            while len(opponent_hand) < 2:
-                card = simulated_deck.deal(1)[0]
-                if card not in used_cards:
-                    opponent_hand.append(card)
-                    used_cards.add(card)
-
-            # Convert hands to Treys format
-            try:
-                treys_community = [Card.new(card) for card in self.convert_to_treys(simulated_board)]
-                treys_hand = [Card.new(card) for card in self.convert_to_treys(hand)]
-                treys_opponent = [Card.new(card) for card in self.convert_to_treys(opponent_hand)]
-            except KeyError as e:
-                print(f"Error converting cards: {e}")
-                continue  # Skip this simulation if conversion fails
+            simulated_deck.reset(dead_mask)
+            simulated_board = community_cards + simulated_deck.deal(missing_cards)
+            opponent_hand = simulated_deck.deal(2)
 
             # Evaluate both hands
-            our_score = self.evaluator.evaluate(treys_community, treys_hand)
-            opponent_score = self.evaluator.evaluate(treys_community, treys_opponent)
+            our_score = handrank.evaluate(hand + simulated_board)
+            opponent_score = handrank.evaluate(opponent_hand + simulated_board)
 
-            if our_score < opponent_score:  # Lower score = better hand in Treys
+            if our_score < opponent_score:  # Lower score = better hand
                 wins += 1
+            elif our_score == opponent_score:  # Split pot
+                wins += 0.5
 
         return wins / num_simulations if num_simulations > 0 else 0.5  # Default to 50% if no valid simulations
 
-    def preflop_hand_strength(self, hand):
-        """Returns a probability estimate of hand strength pre-flop."""
-        ranked_hands = {
-            ('A', 'A'): 0.85, ('K', 'K'): 0.82, ('Q', 'Q'): 0.80, ('J', 'J'): 0.77,
-            ('A', 'K'): 0.75, ('10', '10'): 0.73, ('A', 'Q'): 0.70, ('A', 'J'): 0.68,
-            ('K', 'Q'): 0.66, ('J', '10'): 0.64, ('A', '10'): 0.62, ('K', 'J'): 0.60,
-            ('Q', 'J'): 0.58, ('K', '10'): 0.55, ('Q', '10'): 0.52,
-            ('2', '7'): 0.10, ('3', '8'): 0.12, ('4', '9'): 0.14, ('5', '10'): 0.16,
-        }
-
-        # Extract ranks properly
-        rank_map = {'2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8',
-                    '9': '9', '10': '10', 'J': 'J', 'Q': 'Q', 'K': 'K', 'A': 'A'}
-
-        rank1, suit1 = hand[0].split(' of ')  # Extract rank and suit
-        rank2, suit2 = hand[1].split(' of ')
-
-        # Handle correct mapping for 10 (avoiding '1' issue)
-        rank1 = rank_map.get(rank1, rank1)
-        rank2 = rank_map.get(rank2, rank2)
-
-        values = tuple(sorted([rank1, rank2]))  # Sort values for lookup
-
-        # Debugging output
-        if values not in ranked_hands:
-            print(f"Warning: {values} not found in ranked_hands. Returning default.")
+    def range_simulation(self, hand, community_cards, opponent_ranges, num_simulations=1000,
+                         exact_budget=EXACT_BUDGET):
+        """
+        Estimates equity against weighted opponent ranges (see ranges.HandRange)
+        instead of random hands, e.g. a narrower range after an opponent raises.
+        `hand` may itself be a HandRange.
+        """
+        return range_equity(hand, opponent_ranges, community_cards, num_simulations, self.rng, exact_budget)
 
-        return ranked_hands.get(values, 0.35)  # Default mid-range strength
+    def sequential_simulation(self, hand, community_cards, thresholds, num_opponents=1, confidence=0.95,
+                              max_simulations=10000, exact_budget=EXACT_BUDGET, context=None, deadline=None):
+        """
+        Samples only until the win probability is clearly above or below every
+        decision threshold at the given confidence, or until the perf_counter()
+        `deadline` passes. Returns an EquityEstimate with the best estimate so
+        far, its interval and the number of samples used.
+        A HandContext for the same hand and board reuses its running state.
+        """
+        if context is not None:
+            return context.sequential(thresholds, num_opponents, confidence, max_simulations=max_simulations,
+                                      rng=self.rng, exact_budget=exact_budget, deadline=deadline)
+        return sequential_equity(hand, community_cards, thresholds, num_opponents, confidence,
+                                 max_simulations=max_simulations, rng=self.rng, exact_budget=exact_budget,
+                                 deadline=deadline)
+
+    def preflop_hand_strength(self, hand, num_opponents=1):
+        """
+        Returns the pre-flop all-in equity of the hand against `num_opponents`
+        random hands, from the precomputed 169-class table.
+        """
+        return preflop_equity(hand, num_opponents)
 
     def determine_best_five(self, full_hand):
         """
-        Determines the best five-card hand from a set of seven cards.
-        Uses Treys' evaluator to score all possible 5-card hands and picks the best.
+        Determines the best five-card hand from a set of five to seven cards.
+        The hand evaluator tables record the best five, so no combination loop is needed.
         """
-        best_hand = None
-        best_score = float('inf')  # Lower score is better in Treys
-
-        # Convert human-readable cards to Treys format before evaluation
-        treys_full_hand = [Card.new(card) for card in self.convert_to_treys(full_hand)]
-
-        # Generate all possible 5-card combinations from the 7 cards
-        for five_card_hand in combinations(treys_full_hand, 5):
-            five_card_list = list(five_card_hand)  # Convert tuple to list
-            score = self.evaluator.evaluate([], five_card_list)
-
-            if score < best_score:
-                best_score = score
-                best_hand = five_card_list  # Store the best 5-card list
-
-        return best_hand
+        return handrank.best_five(full_hand)
 
     def evaluate_hand_type(self, hand):
         """
-        Determines the type of the best five-card poker hand.
-        Uses Treys' ranking system and converts it into human-readable format.
+        Determines the type of the best five-card poker hand in human-readable format.
         """
-        evaluator = Evaluator()
-
-        # Ensure 'hand' is a list of Treys card objects, not human-readable format
-        if isinstance(hand[0], str):  # If the first element is a string, convert it
-            treys_hand = [Card.new(card) for card in self.convert_to_treys(hand)]
-        else:
-            treys_hand = hand  # Already in Treys format, no need to convert
-
-        rank_class = evaluator.get_rank_class(evaluator.evaluate([], treys_hand))
-
-        hand_names = {
-            1: "Royal Flush",
-            2: "Straight Flush",
-            3: "Four of a Kind",
-            4: "Full House",
-            5: "Flush",
-            6: "Straight",
-            7: "Three of a Kind",
-            8: "Two Pair",
-            9: "One Pair",
-            10: "High Card"
-        }
-
-        return hand_names.get(rank_class, "Unknown Hand")
+        return handrank.hand_class(handrank.evaluate(hand))
 
     def get_best_hand(self, hand, community_cards):
         """Returns the best five-card hand and its type."""
         full_hand = hand + community_cards  # Combine hole cards with community cards
         best_five = self.determine_best_five(full_hand)  # Use self to call instance method
         hand_type = self.evaluate_hand_type(best_five)  # Use self to call instance method
-        return best_five, hand_type
\ No newline at end of file
+        return best_five, hand_type
+
+
+# Process-wide evaluator for code that needs no seeded generator of its own (e.g. showdowns)
+shared_evaluator = PokerHandEvaluator()
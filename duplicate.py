@@ -0,0 +1,141 @@
+"""
+Duplicate-deal strategy evaluation.
+
+Each duplicate set pre-generates one sequence of shuffled decks and replays
+it once per seat rotation, so every bot plays every seat against exactly the
+same cards. A bot's duplicate score is how much better it did in each seat
+than the average of all bots in that seat, summed over seats. Card luck is
+shared by every bot that sat in a seat and cancels out, which makes strategy
+comparisons significant with far fewer hands than raw chip results.
+"""
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+
+import numpy as np
+
+from equity_cache import shared_cache
+from main import create_bots, run_texas_holdem
+from tournament import BIG_BLIND, SessionStats
+
+
+class DuplicateRecord:
+    """Per-bot duplicate chip scores, summed over duplicate sets."""
+    def __init__(self):
+        self.sets = 0
+        self.hands = 0
+        self.score = 0
+        self.score_squared = 0
+
+    def add_set(self, hands, score):
+        self.sets += 1
+        self.hands += hands
+        self.score += score
+        self.score_squared += score * score
+
+    def merge(self, other):
+        self.sets += other.sets
+        self.hands += other.hands
+        self.score += other.score
+        self.score_squared += other.score_squared
+
+    def bb_per_100(self):
+        return 100 * self.score / (self.hands * BIG_BLIND) if self.hands else 0.0
+
+    def bb_per_100_error(self):
+        """Standard error of bb/100, treating each duplicate set as one sample."""
+        if self.sets < 2:
+            return 0.0
+        mean = self.score / self.sets
+        variance = (self.score_squared - self.sets * mean * mean) / (self.sets - 1)
+        return 100 * sqrt(max(variance, 0) * self.sets) / (self.hands * BIG_BLIND)
+
+
+def play_duplicate_set(seed_sequence, rounds):
+    """
+    Replays one pre-generated deck sequence with the line-up rotated through
+    every seat. Returns {name: DuplicateRecord} for this set.
+    """
+    deck_seed, play_seed = seed_sequence.spawn(2)
+    deck_rng = np.random.default_rng(deck_seed)
+    decks = [deck_rng.permutation(52).tolist() for _ in range(rounds)]
+
+    num_seats = len(create_bots())
+    seat_seeds = play_seed.spawn(num_seats)
+    random_seed = int(play_seed.generate_state(1)[0])
+
+    results = {}  # name -> [(seat, chips, hands)]
+    for rotation in range(num_seats):
+        # Everything random follows the seat, not the bot, so only decisions differ
+        random.seed(random_seed)
+        shared_cache.clear()
+
+        lineup = create_bots()
+        bots = lineup[rotation:] + lineup[:rotation]
+        for bot, seat_seed in zip(bots, seat_seeds):
+            bot.strategy.evaluator.rng = np.random.default_rng(seat_seed)
+
+        stats = SessionStats((bot.name, bot.stack) for bot in bots)
+        run_texas_holdem(rounds, sink=stats, bots=bots, decks=decks)
+
+        for seat, bot in enumerate(bots):
+            record = stats.records[bot.name]
+            results.setdefault(bot.name, []).append((seat, record.chips, record.hands))
+
+    seat_totals = [0] * num_seats
+    for plays in results.values():
+        for seat, chips, _ in plays:
+            seat_totals[seat] += chips
+
+    # Score each play against everyone who sat in the same seat with the same cards
+    records = {}
+    for name, plays in results.items():
+        records[name] = DuplicateRecord()
+        records[name].add_set(sum(hands for _, _, hands in plays),
+                              sum(chips - seat_totals[seat] / num_seats for seat, chips, _ in plays))
+    return records
+
+
+def _play_duplicate_set(args):
+    return play_duplicate_set(*args)
+
+
+def run_duplicate(num_sets=25, rounds=50, workers=None, seed=0):
+    """
+    Plays `num_sets` duplicate sets of `rounds` deals on `workers` processes
+    and returns the merged {name: DuplicateRecord}.
+    """
+    workers = workers or os.cpu_count()
+    seeds = np.random.SeedSequence(seed).spawn(num_sets)
+    chunk_size = max(1, num_sets // (4 * workers))
+    totals = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in pool.map(_play_duplicate_set, [(set_seed, rounds) for set_seed in seeds],
+                                chunksize=chunk_size):
+            for name, record in records.items():
+                totals.setdefault(name, DuplicateRecord()).merge(record)
+
+    return totals
+
+
+def format_report(totals):
+    """Formats duplicate bb/100 per bot, best first."""
+    lines = [f"{'Bot':<16}{'Sets':>6}{'Hands':>9}{'Dup bb/100':>12}{'± SE':>9}"]
+    for name, record in sorted(totals.items(), key=lambda item: -item[1].score):
+        lines.append(f"{name:<16}{record.sets:>6}{record.hands:>9}"
+                     f"{record.bb_per_100():>12.1f}{record.bb_per_100_error():>9.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare bots with duplicate deals.")
+    parser.add_argument('--sets', type=int, default=25, help="duplicate sets (each played once per seat)")
+    parser.add_argument('--rounds', type=int, default=50, help="deals per set")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(format_report(run_duplicate(args.sets, args.rounds, args.workers, args.seed)))
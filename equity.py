@@ -0,0 +1,406 @@
+"""
+NumPy-backed batch equity engine.
+
+Instead of dealing one simulated hand at a time, every runout and opponent hand
+for a whole batch of simulations is drawn at once as an array, with the known
+cards removed from the deck up front, and all hands are scored in bulk.
+"""
+import numpy as np
+from collections import namedtuple
+from itertools import combinations
+from math import comb, sqrt
+from statistics import NormalDist
+from time import perf_counter
+
+from cards import DECK
+from handrank import CARD_KEYS_NP, CARD_SUIT_BITS_NP, FLUSH_SUIT_NP, RANK7, evaluate_batch
+
+
+def score_hands(cards):
+    """Scores an (N, 7) array of cards and returns N ranks (lower is better)."""
+    return evaluate_batch(cards)
+
+
+# Result of an adaptive estimate: the point estimate, its confidence interval,
+# how many deals it took and whether it was enumerated exactly
+EquityEstimate = namedtuple('EquityEstimate', ['equity', 'low', 'high', 'samples', 'exact'])
+
+# Deals at or below this many are enumerated exactly instead of sampled. The
+# turn against one opponent (46 rivers x 990 holdings) fits; the flop does not.
+EXACT_BUDGET = 50000
+
+# Rough cost of enumerating one deal; enumeration that would overrun a
+# decision deadline is skipped in favour of sampling
+EXACT_DEAL_SECONDS = 1e-7
+
+
+def live_cards(dead_cards):
+    """Returns the cards not in `dead_cards` as an array."""
+    dead = set(dead_cards)
+    return np.array([card for card in DECK if card not in dead], dtype=np.intp)
+
+
+def deal_runouts(dead_cards, num_cards, num_simulations, rng):
+    """
+    Draws `num_cards` distinct cards for each of `num_simulations` simulations
+    from the cards not in `dead_cards`. Returns an (N, num_cards) array.
+    """
+    live = live_cards(dead_cards)
+
+    if num_cards > len(live):
+        raise ValueError("Not enough cards left in the deck to deal.")
+    if num_cards == 0:
+        return np.empty((num_simulations, 0), dtype=np.intp)
+
+    # The k smallest of a row of random keys is a uniform random k-card draw
+    keys = rng.random((num_simulations, len(live)))
+    picks = np.argpartition(keys, num_cards - 1, axis=1)[:, :num_cards]
+    return live[picks]
+
+
+def count_deals(dead_cards, missing_cards, num_opponents):
+    """Counts the distinct runout and opponent-holding combinations left to deal."""
+    remaining = 52 - len(set(dead_cards))
+    deals = comb(remaining, missing_cards)
+    remaining -= missing_cards
+    for _ in range(num_opponents):
+        deals *= comb(remaining, 2)
+        remaining -= 2
+    return deals
+
+
+def enumerate_deals(dead_cards, missing_cards, num_opponents):
+    """
+    Lists every runout and opponent-holding combination as rows laid out like
+    deal_runouts: the missing board cards first, then two cards per opponent.
+    """
+    live = live_cards(dead_cards)
+    deals = np.array(list(combinations(live, missing_cards)), dtype=np.intp)
+    deals = deals.reshape(comb(len(live), missing_cards), missing_cards)
+    holdings = np.array(list(combinations(live, 2)), dtype=np.intp)
+
+    for _ in range(num_opponents):
+        deals = np.hstack([np.repeat(deals, len(holdings), axis=0), np.tile(holdings, (len(deals), 1))])
+        clashes = (deals[:, -2:, None] == deals[:, None, :-2]).any(axis=(1, 2))
+        deals = deals[~clashes]
+
+    return deals
+
+
+def heads_up_shares(hand, community_cards):
+    """
+    Enumerates every runout and every opponent holding against a single
+    opponent and returns our pot share in each.
+    """
+    live = live_cards(hand + community_cards)
+    first, second = np.triu_indices(len(live), 1)
+    return holding_shares(hand, community_cards, np.stack([live[first], live[second]], axis=1))[0]
+
+
+def holding_shares(hand, community_cards, holdings):
+    """
+    Enumerates every runout against each of the given (H, 2) opponent
+    holdings, which must not overlap our cards or the board. Returns our pot
+    share in every valid (runout, holding) pair and the holding index of each.
+    Each runout is scored against all holdings at once by adding the
+    holdings' rank keys to the board's.
+    """
+    live = live_cards(hand + community_cards)
+    missing_cards = 5 - len(community_cards)
+
+    runouts = np.array(list(combinations(live, missing_cards)), dtype=np.intp)
+    runouts = runouts.reshape(comb(len(live), missing_cards), missing_cards)
+    boards = np.hstack([np.broadcast_to(np.array(community_cards, dtype=np.intp), (len(runouts), len(community_cards))),
+                        runouts])
+
+    # A holding is only dealt alongside runouts it shares no card with
+    card_masks = np.left_shift(1, np.arange(52, dtype=np.int64))
+    runout_masks = card_masks[runouts].sum(axis=1)
+    holding_masks = card_masks[holdings].sum(axis=1)
+    rows, cols = np.nonzero((runout_masks[:, None] & holding_masks[None, :]) == 0)
+
+    keys = CARD_KEYS_NP[boards].sum(axis=1)[rows] + CARD_KEYS_NP[holdings].sum(axis=1)[cols]
+    opponent_scores = RANK7[keys].astype(np.int32)
+
+    packed = CARD_SUIT_BITS_NP[boards].sum(axis=1)[rows] + CARD_SUIT_BITS_NP[holdings].sum(axis=1)[cols]
+    flushes = np.flatnonzero(FLUSH_SUIT_NP[packed] >= 0)
+    if len(flushes):
+        opponent_scores[flushes] = score_hands(np.hstack([holdings[cols[flushes]], boards[rows[flushes]]]))
+
+    our_scores = score_hands(np.hstack([np.broadcast_to(np.array(hand, dtype=np.intp), (len(boards), 2)), boards]))[rows]
+    return (our_scores < opponent_scores) + (our_scores == opponent_scores) / 2, cols
+
+
+def deal_shares(hand, community_cards, drawn, num_opponents):
+    """
+    Scores every deal in `drawn` (see deal_runouts) and returns our share of
+    the pot in each: 1 for a win, 0 for a loss, a fraction for a split.
+    """
+    num_deals = len(drawn)
+    missing_cards = 5 - len(community_cards)
+
+    board = np.empty((num_deals, 5), dtype=np.intp)
+    board[:, :len(community_cards)] = community_cards
+    board[:, len(community_cards):] = drawn[:, :missing_cards]
+
+    # Score our hand and every opponent hand together: row block 0 is ours
+    holes = np.empty((num_opponents + 1, num_deals, 2), dtype=np.intp)
+    holes[0] = hand
+    holes[1:] = drawn[:, missing_cards:].reshape(num_deals, num_opponents, 2).transpose(1, 0, 2)
+    seven_cards = np.concatenate([holes, np.broadcast_to(board, holes.shape[:2] + (5,))], axis=2)
+    scores = score_hands(seven_cards.reshape(-1, 7)).reshape(num_opponents + 1, num_deals)
+
+    our_scores = scores[0]
+    best_opponent = scores[1:].min(axis=0)
+    tied_opponents = (scores[1:] == best_opponent).sum(axis=0)
+
+    # Lower rank is better; a tie splits the pot with every tied opponent
+    wins = our_scores < best_opponent
+    ties = our_scores == best_opponent
+    return wins + ties / (tied_opponents + 1)
+
+
+def batch_equity(hand, community_cards, num_opponents=1, num_simulations=1000, rng=None,
+                 exact_budget=EXACT_BUDGET):
+    """
+    Estimates the equity of `hand` against `num_opponents` random hands. Ties
+    share the pot. When no more than `exact_budget` deals remain (typically the
+    turn and river) every deal is enumerated and the result is exact;
+    otherwise `num_simulations` runouts are sampled in one batch.
+    """
+    dead_cards = hand + community_cards
+    missing_cards = 5 - len(community_cards)
+
+    if count_deals(dead_cards, missing_cards, num_opponents) <= exact_budget:
+        if num_opponents == 1:
+            return float(heads_up_shares(hand, community_cards).mean())
+        drawn = enumerate_deals(dead_cards, missing_cards, num_opponents)
+        return float(deal_shares(hand, community_cards, drawn, num_opponents).mean())
+
+    if num_simulations <= 0:
+        return 0.5
+    if rng is None:
+        rng = np.random.default_rng()
+
+    drawn = deal_runouts(dead_cards, missing_cards + 2 * num_opponents, num_simulations, rng)
+    return float(deal_shares(hand, community_cards, drawn, num_opponents).mean())
+
+
+def spot_equities(hands, boards, num_simulations=1000, rng=None):
+    """
+    Heads-up equity of many spots at once: `hands` is (M, 2) and `boards` is
+    (M, K) with the same board size K for every spot. Each spot gets
+    `num_simulations` random runouts and opponent hands, and every deal of
+    every spot is scored in one batch. Returns M equities.
+    """
+    return spot_shares(hands, boards, num_simulations, rng).mean(axis=1)
+
+
+def spot_shares(hands, boards, num_simulations, rng=None):
+    """
+    Deals `num_simulations` random runouts and opponent hands for every spot
+    (see spot_equities) and returns our (M, num_simulations) pot shares.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    hands = np.asarray(hands, dtype=np.intp).reshape(-1, 2)
+    boards = np.asarray(boards, dtype=np.intp).reshape(len(hands), -1)
+    count, board_size = boards.shape
+    missing_cards = 5 - board_size
+    num_live = 50 - board_size
+    num_cards = missing_cards + 2
+
+    live = spot_live_cards(hands, boards)
+
+    # Distinct live positions per deal: each pick skips past the earlier ones
+    rows = count * num_simulations
+    positions = np.empty((rows, num_cards), dtype=np.intp)
+    for column in range(num_cards):
+        pick = rng.integers(0, num_live - column, rows)
+        for earlier in np.sort(positions[:, :column], axis=1).T:
+            pick += pick >= earlier
+        positions[:, column] = pick
+    drawn = live[np.arange(rows)[:, None] // num_simulations, positions]
+
+    board = np.concatenate([np.repeat(boards, num_simulations, axis=0), drawn[:, :missing_cards]], axis=1)
+    ours = score_hands(np.concatenate([np.repeat(hands, num_simulations, axis=0), board], axis=1))
+    theirs = score_hands(np.concatenate([drawn[:, missing_cards:], board], axis=1))
+
+    # Lower rank is better; a tie splits the pot
+    shares = (ours < theirs) + 0.5 * (ours == theirs)
+    return shares.reshape(count, num_simulations)
+
+
+def spot_live_cards(hands, boards):
+    """Every spot's live cards as an (M, 50 - K) array, in card order."""
+    count, board_size = boards.shape
+    # argsort puts the cards not in the spot first
+    dead = np.zeros((count, 52), dtype=bool)
+    np.put_along_axis(dead, np.concatenate([hands, boards], axis=1), True, axis=1)
+    return np.argsort(dead, axis=1, kind='stable')[:, :50 - board_size]
+
+
+def spot_sequential_equities(hands, boards, thresholds, confidence=0.95, batch_size=250, max_simulations=10000,
+                             rng=None):
+    """
+    sequential_equity heads-up for many spots at once. `thresholds` is (M, T),
+    one row of decision thresholds per spot. Every round deals `batch_size`
+    more runouts to each spot that is still undecided, in one batch, and a
+    spot drops out once its interval clears its thresholds or it reaches
+    `max_simulations`. Returns the equities, interval bounds and sample
+    counts as arrays.
+    """
+    hands = np.asarray(hands, dtype=np.intp).reshape(-1, 2)
+    boards = np.asarray(boards, dtype=np.intp).reshape(len(hands), -1)
+    thresholds = np.asarray(thresholds, dtype=float).reshape(len(hands), -1)
+    count = len(hands)
+    if max_simulations <= 0:
+        return np.full(count, 0.5), np.zeros(count), np.ones(count), np.zeros(count, dtype=int)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    totals = np.zeros(count)
+    samples = np.zeros(count, dtype=int)
+    lows = np.zeros(count)
+    highs = np.ones(count)
+    active = np.arange(count)
+    while len(active):
+        totals[active] += spot_shares(hands[active], boards[active], batch_size, rng).sum(axis=1)
+        samples[active] += batch_size
+
+        lows[active], highs[active] = confidence_intervals(totals[active] / samples[active], samples[active],
+                                                           confidence)
+        spot_thresholds = thresholds[active]
+        undecided = ((lows[active, None] < spot_thresholds) & (spot_thresholds < highs[active, None])).any(axis=1)
+        active = active[undecided & (samples[active] < max_simulations)]
+
+    return totals / samples, lows, highs, samples
+
+
+# Heads-up deal layout per board size: the runouts and holdings as live-card
+# positions, and every (runout, holding) pair that shares no position
+_exact_layouts = {}
+
+
+def exact_layout(board_size):
+    layout = _exact_layouts.get(board_size)
+    if layout is None:
+        num_live = 50 - board_size
+        runouts = np.array(list(combinations(range(num_live), 5 - board_size)), dtype=np.intp)
+        runouts = runouts.reshape(comb(num_live, 5 - board_size), 5 - board_size)
+        holdings = np.array(list(combinations(range(num_live), 2)), dtype=np.intp)
+
+        position_masks = np.left_shift(1, np.arange(num_live, dtype=np.int64))
+        runout_masks = position_masks[runouts].sum(axis=1)
+        holding_masks = position_masks[holdings].sum(axis=1)
+        pairs = np.nonzero((runout_masks[:, None] & holding_masks[None, :]) == 0)
+        layout = _exact_layouts[board_size] = (runouts, holdings) + pairs
+    return layout
+
+
+def spot_exact_equities(hands, boards, chunk_deals=2000000):
+    """
+    Exact heads-up equity of many spots with the same board size K, each
+    enumerated like heads_up_shares. Live cards are laid out the same way
+    for every spot, so the valid (runout, holding) pairs are worked out
+    once and every spot is scored in the same arrays, about `chunk_deals`
+    deals at a time. Meant for the turn and river; returns M equities.
+    """
+    hands = np.asarray(hands, dtype=np.intp).reshape(-1, 2)
+    boards = np.asarray(boards, dtype=np.intp).reshape(len(hands), -1)
+    runouts, holdings, pair_runouts, pair_holdings = exact_layout(boards.shape[1])
+    chunk_size = max(1, chunk_deals // len(pair_runouts))
+
+    equities = np.empty(len(hands))
+    for start in range(0, len(hands), chunk_size):
+        chunk_hands = hands[start:start + chunk_size]
+        chunk_boards = boards[start:start + chunk_size]
+        live = spot_live_cards(chunk_hands, chunk_boards)
+        count = len(live)
+
+        # Rank keys and suit sums of every runout and holding, per spot
+        live_keys = CARD_KEYS_NP[live].astype(np.int64)
+        live_suits = CARD_SUIT_BITS_NP[live].astype(np.int64)
+        board_keys = CARD_KEYS_NP[chunk_boards].sum(axis=1)[:, None] + live_keys[:, runouts].sum(axis=2)
+        board_suits = CARD_SUIT_BITS_NP[chunk_boards].sum(axis=1)[:, None] + live_suits[:, runouts].sum(axis=2)
+        keys = board_keys[:, pair_runouts] + live_keys[:, holdings].sum(axis=2)[:, pair_holdings]
+        suits = board_suits[:, pair_runouts] + live_suits[:, holdings].sum(axis=2)[:, pair_holdings]
+
+        theirs = RANK7[keys].astype(np.int32)
+        spots, deals = np.nonzero(FLUSH_SUIT_NP[suits] >= 0)
+        if len(spots):
+            # Possible flushes are scored from the cards themselves
+            cards = np.concatenate([live[spots[:, None], holdings[pair_holdings[deals]]], chunk_boards[spots],
+                                    live[spots[:, None], runouts[pair_runouts[deals]]]], axis=1)
+            theirs[spots, deals] = score_hands(cards)
+
+        full_boards = np.concatenate([np.repeat(chunk_boards, len(runouts), axis=0),
+                                      live[:, runouts].reshape(count * len(runouts), -1)], axis=1)
+        ours = score_hands(np.concatenate([np.repeat(chunk_hands, len(runouts), axis=0), full_boards], axis=1))
+        ours = ours.reshape(count, len(runouts))[:, pair_runouts]
+
+        # Lower rank is better; a tie splits the pot
+        equities[start:start + count] = ((ours < theirs) + 0.5 * (ours == theirs)).mean(axis=1)
+    return equities
+
+
+def confidence_interval(equity, samples, confidence):
+    """
+    Wilson score interval for a mean of pot shares in [0, 1]. Bounded shares
+    never have more variance than a coin with the same mean, so this is safe
+    for split pots too, and it stays sensible when every sample agrees.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z * z / samples
+    centre = (equity + z * z / (2 * samples)) / denominator
+    margin = z * sqrt(equity * (1 - equity) / samples + z * z / (4 * samples * samples)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def confidence_intervals(equities, samples, confidence):
+    """confidence_interval for arrays of equities and sample counts."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    samples = np.asarray(samples, dtype=float)
+    denominator = 1 + z * z / samples
+    centre = (equities + z * z / (2 * samples)) / denominator
+    margin = z * np.sqrt(equities * (1 - equities) / samples + z * z / (4 * samples * samples)) / denominator
+    return np.maximum(0.0, centre - margin), np.minimum(1.0, centre + margin)
+
+
+def sequential_equity(hand, community_cards, thresholds, num_opponents=1, confidence=0.95,
+                      batch_size=250, max_simulations=10000, rng=None, exact_budget=EXACT_BUDGET, deadline=None):
+    """
+    Samples in batches of `batch_size` until the confidence interval lies
+    clearly on one side of every decision threshold, `max_simulations` is
+    reached or the perf_counter() `deadline` passes (after at least one
+    batch). Spots small enough to enumerate in time are answered exactly;
+    with no simulations allowed the answer is 0.5, as in batch_equity.
+    Returns an EquityEstimate.
+    """
+    dead_cards = hand + community_cards
+    missing_cards = 5 - len(community_cards)
+
+    num_deals = count_deals(dead_cards, missing_cards, num_opponents)
+    if num_deals <= exact_budget and (deadline is None or deadline - perf_counter() >= num_deals * EXACT_DEAL_SECONDS):
+        equity = batch_equity(hand, community_cards, num_opponents, rng=rng, exact_budget=exact_budget)
+        return EquityEstimate(equity, equity, equity, num_deals, True)
+
+    if max_simulations <= 0:
+        return EquityEstimate(0.5, 0.0, 1.0, 0, False)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    total = 0.0
+    samples = 0
+    while samples < max_simulations:
+        drawn = deal_runouts(dead_cards, missing_cards + 2 * num_opponents, batch_size, rng)
+        total += float(deal_shares(hand, community_cards, drawn, num_opponents).sum())
+        samples += batch_size
+
+        low, high = confidence_interval(total / samples, samples, confidence)
+        if not any(low < threshold < high for threshold in thresholds):
+            break
+        if deadline is not None and perf_counter() >= deadline:
+            break
+
+    return EquityEstimate(total / samples, low, high, samples, False)
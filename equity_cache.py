@@ -0,0 +1,86 @@
+"""
+Process-wide LRU cache of equity estimates.
+
+Spots are keyed on a canonical form of hole cards + board + opponent count:
+card order within the hole cards and within the board is ignored, and suits
+are relabelled so that spots which only differ by a suit permutation (say
+A♥K♥ on a heart flop and A♠K♠ on the same flop in spades) share one entry.
+"""
+from collections import OrderedDict
+from itertools import permutations
+from threading import Lock
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def canonical_key(hand, community_cards, num_opponents):
+    """Returns the smallest suit relabelling of the spot, with cards sorted within each group."""
+    best = None
+    for suits in SUIT_PERMUTATIONS:
+        key = (tuple(sorted(card & ~3 | suits[card & 3] for card in hand)),
+               tuple(sorted(card & ~3 | suits[card & 3] for card in community_cards)))
+        if best is None or key < best:
+            best = key
+    return best + (num_opponents,)
+
+
+class EquityCache:
+    """
+    Bounded LRU map from canonical spots to EquityEstimates, with hit, miss
+    and eviction counters. Safe to share between threads.
+    """
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def lookup(self, key, thresholds=()):
+        """
+        Returns the cached estimate for `key`, or None. An estimate whose
+        interval still straddles one of `thresholds` cannot settle the decision
+        and counts as a miss.
+        """
+        with self.lock:
+            estimate = self.entries.get(key)
+            if estimate is None or any(estimate.low < threshold < estimate.high for threshold in thresholds):
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return estimate
+
+    def store(self, key, estimate):
+        """Caches `estimate`, evicting the least recently used entry when full."""
+        with self.lock:
+            self.entries[key] = estimate
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the hit/miss/eviction counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# One cache for every strategy in the process
+shared_cache = EquityCache()
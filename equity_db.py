@@ -0,0 +1,196 @@
+"""
+Persistent on-disk equity database.
+
+Equity estimates for canonical spots (see equity_cache.canonical_key) are
+stored in one file: a header, then the packed uint64 spot keys in sorted
+order, then one fixed-size record per key. The file is opened with numpy
+memmap and searched with searchsorted, so parallel workers all share the
+same read-only pages of the page cache instead of each holding a copy.
+
+The database is built offline (python equity_db.py) and can also collect
+the spots a run computes (record=True) and merge them in with save().
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from equity import EXACT_BUDGET, EquityEstimate, batch_equity, confidence_interval, count_deals
+from equity_cache import canonical_key
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'equity_db.bin')
+
+MAGIC = b'EQDB'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQ')  # magic, version, padding, entries
+
+RECORD = np.dtype([('equity', '<f4'), ('low', '<f4'), ('high', '<f4'), ('samples', '<u4'), ('exact', 'u1')])
+
+STREETS = {'flop': 3, 'turn': 4, 'river': 5}
+
+
+def pack_key(key):
+    """
+    Packs a canonical (hand, board, num_opponents) key into one integer:
+    the opponent count above seven 6-bit card slots (card + 1, 0 when empty).
+    """
+    hand, board, num_opponents = key
+    packed = num_opponents
+    cards = hand + board
+    for slot in range(7):
+        packed = packed << 6 | (cards[slot] + 1 if slot < len(cards) else 0)
+    return packed
+
+
+def write_db(entries, path=DB_PATH):
+    """Writes {packed key: EquityEstimate} to `path`, replacing it atomically."""
+    keys = np.array(sorted(entries), dtype=np.uint64)
+    records = np.zeros(len(keys), dtype=RECORD)
+    for index, key in enumerate(keys.tolist()):
+        estimate = entries[key]
+        records[index] = (estimate.equity, estimate.low, estimate.high, estimate.samples, estimate.exact)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        file.write(keys.tobytes())
+        file.write(records.tobytes())
+    os.replace(temporary, path)
+
+
+class EquityDB:
+    """
+    Read-only view of an equity database file, opened on first lookup.
+    With `record` set, estimates passed to record() are kept in memory until
+    save() merges them into the file.
+    """
+    def __init__(self, path=DB_PATH, record=False):
+        self.path = path
+        self.recording = record
+        self.pending = {}
+        self.keys = None
+        self.records = None
+        self.hits = 0
+        self.misses = 0
+
+    def open(self):
+        """Maps the file into memory; a missing file is an empty database."""
+        if not os.path.exists(self.path):
+            self.keys = np.empty(0, dtype=np.uint64)
+            self.records = np.empty(0, dtype=RECORD)
+            return
+
+        with open(self.path, 'rb') as file:
+            magic, version, count = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} equity database.")
+
+        if count == 0:
+            self.keys = np.empty(0, dtype=np.uint64)
+            self.records = np.empty(0, dtype=RECORD)
+            return
+        self.keys = np.memmap(self.path, dtype=np.uint64, mode='r', offset=HEADER.size, shape=(count,))
+        self.records = np.memmap(self.path, dtype=RECORD, mode='r', offset=HEADER.size + 8 * count,
+                                 shape=(count,))
+
+    def lookup(self, key, thresholds=()):
+        """
+        Returns the stored EquityEstimate for a canonical key, or None. Like
+        the in-memory cache, an estimate whose interval straddles one of
+        `thresholds` counts as a miss.
+        """
+        if self.keys is None:
+            self.open()
+
+        packed = pack_key(key)
+        estimate = self.pending.get(packed)
+        if estimate is None:
+            index = int(np.searchsorted(self.keys, np.uint64(packed)))
+            if index < len(self.keys) and int(self.keys[index]) == packed:
+                equity, low, high, samples, exact = self.records[index].item()
+                estimate = EquityEstimate(equity, low, high, samples, bool(exact))
+
+        if estimate is None or any(estimate.low < threshold < estimate.high for threshold in thresholds):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return estimate
+
+    def record(self, key, estimate):
+        """Remembers a freshly computed estimate when recording is on."""
+        if self.recording:
+            self.pending[pack_key(key)] = estimate
+
+    def save(self):
+        """
+        Merges recorded estimates into the file, preferring exact estimates
+        and then whichever used more samples, and reopens it.
+        """
+        if self.keys is None:
+            self.open()
+
+        entries = {}
+        for key, record in zip(self.keys.tolist(), self.records.tolist()):
+            equity, low, high, samples, exact = record
+            entries[key] = EquityEstimate(equity, low, high, samples, bool(exact))
+        for key, estimate in self.pending.items():
+            stored = entries.get(key)
+            if stored is None or not stored.exact and (estimate.exact or estimate.samples > stored.samples):
+                entries[key] = estimate
+
+        self.keys = self.records = None  # Drop the maps before replacing the file
+        write_db(entries, self.path)
+        self.pending.clear()
+        self.open()
+
+    def __len__(self):
+        if self.keys is None:
+            self.open()
+        return len(self.keys)
+
+
+def build_db(num_spots=10000, streets=('flop',), num_simulations=20000, confidence=0.95, seed=0):
+    """
+    Computes heads-up equity for `num_spots` random spots per street and
+    returns {packed key: EquityEstimate}. Spots small enough to enumerate are
+    stored exactly.
+    """
+    rng = np.random.default_rng(seed)
+    entries = {}
+    for street in streets:
+        board_size = STREETS[street]
+        for _ in range(num_spots):
+            cards = rng.choice(52, 2 + board_size, replace=False).tolist()
+            hand, board = cards[:2], cards[2:]
+            packed = pack_key(canonical_key(hand, board, 1))
+            if packed in entries:
+                continue
+
+            equity = batch_equity(hand, board, 1, num_simulations, rng)
+            deals = count_deals(hand + board, 5 - board_size, 1)
+            if deals <= EXACT_BUDGET:
+                entries[packed] = EquityEstimate(equity, equity, equity, deals, True)
+            else:
+                low, high = confidence_interval(equity, num_simulations, confidence)
+                entries[packed] = EquityEstimate(equity, low, high, num_simulations, False)
+    return entries
+
+
+# One database for every strategy in the process
+shared_db = EquityDB()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the on-disk equity database.")
+    parser.add_argument('--spots', type=int, default=10000, help="random spots per street")
+    parser.add_argument('--streets', nargs='*', default=['flop'], choices=list(STREETS))
+    parser.add_argument('--simulations', type=int, default=20000, help="simulations per sampled spot")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DB_PATH)
+    args = parser.parse_args()
+
+    db = EquityDB(args.output, record=True)
+    db.pending.update(build_db(args.spots, args.streets, args.simulations, seed=args.seed))
+    db.save()
+    print(f"Equity database {args.output} now holds {len(db)} spots")
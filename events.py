@@ -0,0 +1,151 @@
+"""
+Typed game events and the sinks that consume them.
+
+The engine and the strategies never print directly; they emit events to a
+sink. ConsoleSink reproduces the classic table output, while NullSink,
+CountingSink and BufferedFileSink let simulations run without paying for
+string formatting or console I/O.
+"""
+import json
+from collections import Counter, namedtuple
+
+from cards import cards_to_str
+
+RoundStarted = namedtuple('RoundStarted', ['round_num'])
+HandStarted = namedtuple('HandStarted', ['dealer', 'seats'])  # seats: [(name, stack before the blinds)]
+BlindPosted = namedtuple('BlindPosted', ['name', 'blind', 'amount'])
+StreetDealt = namedtuple('StreetDealt', ['stage', 'community_cards'])
+HoleCards = namedtuple('HoleCards', ['name', 'hand'])
+ActionTaken = namedtuple('ActionTaken', ['name', 'action', 'amount', 'pot'])
+PreflopStrength = namedtuple('PreflopStrength', ['hand', 'strength'])
+EquityEstimated = namedtuple('EquityEstimated', ['hand', 'community_cards', 'base_probability',
+                                                 'adjustment_factor', 'final_probability', 'estimate'])
+PotWon = namedtuple('PotWon', ['name', 'pot', 'reason'])
+Showdown = namedtuple('Showdown', ['winners', 'pot', 'hand_type', 'best_hands', 'players'])
+Stacks = namedtuple('Stacks', ['stacks'])
+GameOver = namedtuple('GameOver', ['name', 'stack', 'last_standing'])
+
+
+class NullSink:
+    """Discards every event."""
+    # Whether events should carry display-only details (best hands, labels)
+    detailed = False
+
+    def emit(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class CountingSink(NullSink):
+    """Counts events by type in memory."""
+    def __init__(self):
+        self.counts = Counter()
+
+    def emit(self, event):
+        self.counts[type(event).__name__] += 1
+
+
+class BufferedFileSink(NullSink):
+    """
+    Writes events as JSON lines, buffering `buffer_size` events between writes.
+    Call close() (or use it as a context manager) to flush the tail.
+    """
+    detailed = True
+
+    def __init__(self, path, buffer_size=10000):
+        self.file = open(path, 'w')
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def emit(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(json.dumps({'event': type(event).__name__, **event._asdict()}) + "\n"
+                             for event in self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConsoleSink(NullSink):
+    """Prints events in the classic human-readable table format."""
+    detailed = True
+
+    ACTION_FORMATS = {
+        'fold': "{name} 🏳️ folds.",
+        'call': "{name} 🔵 calls with {amount} chips. (Pot: {pot})",
+        'raise': "{name} 🔺 raises with {amount} chips. (Pot: {pot})",
+        'check': "{name} ✅ checks.",
+    }
+
+    def emit(self, event):
+        handler = getattr(self, 'on_' + type(event).__name__, None)
+        if handler is not None:
+            handler(event)
+
+    def on_RoundStarted(self, event):
+        print(f"\n==========================")
+        print(f"       ROUND {event.round_num}     ")
+        print(f"==========================")
+
+    def on_BlindPosted(self, event):
+        print(f"{event.name} posts the {event.blind} Blind ({event.amount} chips).")
+
+    def on_StreetDealt(self, event):
+        print(f"\n===== {event.stage} =====")
+        print("\nCommunity Cards: " + (cards_to_str(event.community_cards) if event.community_cards else "None"))
+
+    def on_HoleCards(self, event):
+        print(f"{event.name} has: {cards_to_str(event.hand)}")
+
+    def on_ActionTaken(self, event):
+        print(self.ACTION_FORMATS[event.action].format(**event._asdict()))
+
+    def on_PreflopStrength(self, event):
+        print(f"🃏 Pre-flop: Hand {cards_to_str(event.hand)}, Strength: {event.strength:.2f}")
+
+    def on_EquityEstimated(self, event):
+        print(f"📊 Hand: {cards_to_str(event.hand)}, Community: {cards_to_str(event.community_cards)}, "
+              f"Base Prob: {event.base_probability:.2f}, "
+              f"Adj Factor: {event.adjustment_factor:.2f}, Final Prob: {event.final_probability:.2f}")
+        if event.estimate is not None:
+            print(f"   Samples: {event.estimate.samples}, "
+                  f"Interval: [{event.estimate.low:.2f}, {event.estimate.high:.2f}]")
+
+    def on_PotWon(self, event):
+        print(f"\n🏆 {event.name} wins the pot of {event.pot} chips! ({event.reason})")
+
+    def on_Showdown(self, event):
+        if len(event.winners) == 1:
+            print(f"\n🏆 Winner: {event.winners[0]} with a {event.hand_type}! ({cards_to_str(event.best_hands[0])})")
+            print(f"💰 Wins {event.pot} chips!")
+            return
+
+        print(f"\n🤝 Split pot: {', '.join(event.winners)} tie with a {event.hand_type}!")
+        for name, best_hand in zip(event.winners, event.best_hands):
+            print(f"  {name}: {cards_to_str(best_hand)}")
+        print(f"💰 They share {event.pot} chips!")
+
+    def on_Stacks(self, event):
+        print("\n💰 Chip Standings:")
+        for name, stack in event.stacks:
+            print(f"  {name}: {stack} chips")
+
+    def on_GameOver(self, event):
+        if event.last_standing:
+            print(f"\n🏆 FINAL WINNER: {event.name} with {event.stack} chips!")
+        else:
+            print(f"\n🏆 Overall Winner: {event.name} with {event.stack} chips!")
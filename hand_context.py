@@ -0,0 +1,170 @@
+"""
+Incremental evaluation state for one player's hand in progress.
+
+play_hand creates a HandContext when hole cards are dealt and adds each
+community card as it arrives. The context keeps running rank-key and suit
+sums for the hole cards and the board, the cards still live in the deck, the
+canonical cache key and any exact equity already worked out for the street,
+so a decision only pays for what changed since the last one.
+"""
+from time import perf_counter
+
+import numpy as np
+
+from cards import DECK
+from equity import EXACT_BUDGET, EXACT_DEAL_SECONDS, EquityEstimate, batch_equity, confidence_interval, count_deals
+from equity_cache import canonical_key
+from handrank import CARD_KEYS, CARD_KEYS_NP, CARD_SUIT_BITS, CARD_SUIT_BITS_NP, FLUSH_SUIT_NP, RANK7, evaluate_batch
+
+
+class HandContext:
+    """Hole cards plus the board so far, with partial sums kept up to date."""
+    __slots__ = ('hand', 'board', 'hand_key', 'hand_suits', 'board_key', 'board_suits', 'live',
+                 '_canonical', '_exact')
+
+    def __init__(self, hand, community_cards=()):
+        self.hand = list(hand)
+        self.board = []
+        self.hand_key = CARD_KEYS[hand[0]] + CARD_KEYS[hand[1]]
+        self.hand_suits = CARD_SUIT_BITS[hand[0]] + CARD_SUIT_BITS[hand[1]]
+        self.board_key = 0
+        self.board_suits = 0
+        self.live = np.array([card for card in DECK if card not in hand], dtype=np.intp)
+        self._canonical = {}
+        self._exact = {}
+        self.add_cards(community_cards)
+
+    def add_cards(self, cards):
+        """Adds newly dealt community cards."""
+        if not len(cards):
+            return
+        for card in cards:
+            self.board.append(card)
+            self.board_key += CARD_KEYS[card]
+            self.board_suits += CARD_SUIT_BITS[card]
+        self.live = self.live[~np.isin(self.live, cards)]
+        self._canonical.clear()
+        self._exact.clear()
+
+    def sync(self, community_cards):
+        """Catches up with a board that has grown since the last update."""
+        if len(community_cards) > len(self.board):
+            self.add_cards(community_cards[len(self.board):])
+
+    def canonical_key(self, num_opponents=1):
+        """The equity cache key for this street, worked out once per street."""
+        key = self._canonical.get(num_opponents)
+        if key is None:
+            key = self._canonical[num_opponents] = canonical_key(self.hand, self.board, num_opponents)
+        return key
+
+    def deal(self, num_opponents, num_simulations, rng):
+        """
+        Draws the missing board cards and `num_opponents` holdings from the
+        live cards for every simulation, laid out like equity.deal_runouts.
+        """
+        num_cards = 5 - len(self.board) + 2 * num_opponents
+        num_live = len(self.live)
+
+        # Partial Fisher-Yates on every row at once: only the first num_cards
+        # positions are shuffled, so no full permutation or sort is needed
+        decks = np.broadcast_to(self.live, (num_simulations, num_live)).copy()
+        rows = np.arange(num_simulations)
+        for position in range(num_cards):
+            picks = rng.integers(position, num_live, num_simulations)
+            chosen = decks[rows, picks]
+            decks[rows, picks] = decks[:, position]
+            decks[:, position] = chosen
+        return decks[:, :num_cards]
+
+    def shares(self, drawn, num_opponents):
+        """
+        Returns our pot share in each deal. Hands are scored from the running
+        sums plus the drawn cards; only rows that can hold a flush are built
+        out as full seven-card hands.
+        """
+        num_deals = len(drawn)
+        missing_cards = 5 - len(self.board)
+        runouts = drawn[:, :missing_cards]
+        holes = drawn[:, missing_cards:].reshape(num_deals, num_opponents, 2)
+
+        runout_keys = self.board_key + CARD_KEYS_NP[runouts].sum(axis=1)
+        runout_suits = self.board_suits + CARD_SUIT_BITS_NP[runouts].sum(axis=1)
+
+        keys = np.empty((num_deals, num_opponents + 1), dtype=np.intp)
+        keys[:, 0] = runout_keys + self.hand_key
+        keys[:, 1:] = runout_keys[:, None] + CARD_KEYS_NP[holes].sum(axis=2)
+        suits = np.empty_like(keys)
+        suits[:, 0] = runout_suits + self.hand_suits
+        suits[:, 1:] = runout_suits[:, None] + CARD_SUIT_BITS_NP[holes].sum(axis=2)
+
+        scores = RANK7[keys].astype(np.int32)
+        rows, players = np.nonzero(FLUSH_SUIT_NP[suits] >= 0)
+        if len(rows):
+            seven_cards = np.empty((len(rows), 7), dtype=np.intp)
+            seven_cards[:, :2] = np.where(players[:, None] == 0, self.hand, holes[rows, np.maximum(players - 1, 0)])
+            seven_cards[:, 2:2 + len(self.board)] = self.board
+            seven_cards[:, 2 + len(self.board):] = runouts[rows]
+            scores[rows, players] = evaluate_batch(seven_cards)
+
+        # Lower rank is better; a tie splits the pot with everyone tied
+        winners = scores == scores.min(axis=1, keepdims=True)
+        return winners[:, 0] / winners.sum(axis=1)
+
+    def exact_equity(self, num_opponents, rng, exact_budget=EXACT_BUDGET, deadline=None):
+        """
+        Returns (equity, deals) when the spot is small enough to enumerate
+        before `deadline`, else None. The result is kept until the next card
+        arrives.
+        """
+        if num_opponents in self._exact:
+            return self._exact[num_opponents]
+
+        num_deals = count_deals(self.hand + self.board, 5 - len(self.board), num_opponents)
+        if num_deals > exact_budget:
+            self._exact[num_opponents] = None
+            return None
+        if deadline is not None and deadline - perf_counter() < num_deals * EXACT_DEAL_SECONDS:
+            return None  # Not enough time now; a later decision may have more
+
+        result = (batch_equity(self.hand, self.board, num_opponents, rng=rng, exact_budget=exact_budget), num_deals)
+        self._exact[num_opponents] = result
+        return result
+
+    def equity(self, num_opponents=1, num_simulations=1000, rng=None, exact_budget=EXACT_BUDGET):
+        """Same as equity.batch_equity for this hand and board."""
+        exact = self.exact_equity(num_opponents, rng, exact_budget)
+        if exact is not None:
+            return exact[0]
+        if num_simulations <= 0:
+            return 0.5
+        if rng is None:
+            rng = np.random.default_rng()
+        return float(self.shares(self.deal(num_opponents, num_simulations, rng), num_opponents).mean())
+
+    def sequential(self, thresholds, num_opponents=1, confidence=0.95, batch_size=250, max_simulations=10000,
+                   rng=None, exact_budget=EXACT_BUDGET, deadline=None):
+        """Same as equity.sequential_equity for this hand and board."""
+        exact = self.exact_equity(num_opponents, rng, exact_budget, deadline)
+        if exact is not None:
+            equity, num_deals = exact
+            return EquityEstimate(equity, equity, equity, num_deals, True)
+
+        if max_simulations <= 0:
+            return EquityEstimate(0.5, 0.0, 1.0, 0, False)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        total = 0.0
+        samples = 0
+        while samples < max_simulations:
+            total += float(self.shares(self.deal(num_opponents, batch_size, rng), num_opponents).sum())
+            samples += batch_size
+
+            low, high = confidence_interval(total / samples, samples, confidence)
+            if not any(low < threshold < high for threshold in thresholds):
+                break
+            if deadline is not None and perf_counter() >= deadline:
+                break
+
+        return EquityEstimate(total / samples, low, high, samples, False)
@@ -0,0 +1,391 @@
+"""
+Compact binary hand histories.
+
+HandHistorySink records every hand a game plays to an append-only file in
+buffered batches. The file starts with a small header and is then a run of
+tagged chunks:
+
+* b'N' + length byte + UTF-8 name: the next player number is this name;
+* b'H' + HAND + one SEAT per seat + one ACTION per action: a finished hand.
+
+Cards are stored as single bytes (NO_CARD for a board card never dealt) and
+chips as 32-bit integers, so a typical hand takes around 100 bytes. HandHistory
+memory-maps a file to iterate its hands one at a time or to gather whole
+columns into NumPy arrays, and replay_hand() plays any recorded hand through
+the engine again with the recorded decisions.
+"""
+import argparse
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from cards import DECK
+from events import ConsoleSink, NullSink, Stacks
+from logic import Action, PokerBot
+
+MAGIC = b'HHST'
+VERSION = 1
+HEADER = struct.Struct('<4sB3x')  # magic, version, padding
+
+NAME_TAG = b'N'
+HAND_TAG = b'H'
+
+STAGES = ['Pre-flop', 'Flop', 'Turn', 'River']
+NO_CARD = 255
+
+HAND = np.dtype([('round', '<u4'), ('dealer', 'u1'), ('seats', 'u1'), ('actions', '<u2'), ('pot', '<u4'),
+                 ('board', 'u1', 5), ('showdown', 'u1')])
+SEAT = np.dtype([('player', '<u2'), ('hole', 'u1', 2), ('start_stack', '<u4'), ('end_stack', '<u4'),
+                 ('won', 'u1'), ('showdown', 'u1')])
+ACTION = np.dtype([('seat', 'u1'), ('street', 'u1'), ('action', 'u1'), ('amount', '<i4'), ('pot', '<i4')])
+
+# seats and actions counts, read while indexing without decoding the whole hand
+HAND_COUNTS = struct.Struct('<4xxBH')
+
+ACTION_CODES = {'fold': Action.FOLD, 'check': Action.CHECK, 'call': Action.CALL, 'raise': Action.RAISE}
+
+Hand = namedtuple('Hand', ['round', 'dealer', 'pot', 'board', 'showdown', 'seats', 'actions'])
+Seat = namedtuple('Seat', ['name', 'hole', 'start_stack', 'end_stack', 'won', 'showdown'])
+HandAction = namedtuple('HandAction', ['seat', 'street', 'action', 'amount', 'pot'])
+
+
+def read_names(path):
+    """Returns the player names a history file defines, in player-number order."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    history = HandHistory(path)
+    names = history.names
+    history.close()
+    return names
+
+
+class HandHistorySink(NullSink):
+    """
+    Records hands to `path`, appending to any history already there. Hands
+    are encoded as they finish (the Stacks event closes each one) and written
+    `buffer_size` hands at a time; call close() to write the rest.
+    """
+    def __init__(self, path, buffer_size=1000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.players = {name: number for number, name in enumerate(read_names(path))}
+        self.chunks = []
+        self.buffered_hands = 0
+        self.hand = None
+        self.round = 0
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as file:
+                file.write(HEADER.pack(MAGIC, VERSION))
+
+    def emit(self, event):
+        handler = getattr(self, 'on_' + type(event).__name__, None)
+        if handler is not None:
+            handler(event)
+
+    def on_RoundStarted(self, event):
+        self.round = event.round_num
+
+    def on_HandStarted(self, event):
+        seats = np.zeros(len(event.seats), dtype=SEAT)
+        seats['start_stack'] = [stack for _, stack in event.seats]
+        seats['player'] = [self.player(name) for name, _ in event.seats]
+        self.hand = {
+            'dealer': event.dealer,
+            'seats': seats,
+            'seat_of': {name: seat for seat, (name, _) in enumerate(event.seats)},
+            'dealt': set(),
+            'board': [],
+            'street': 0,
+            'actions': [],
+            'pot': 0,
+            'showdown': False,
+        }
+
+    def on_HoleCards(self, event):
+        hand = self.hand
+        if hand is not None and event.name not in hand['dealt']:
+            hand['dealt'].add(event.name)
+            hand['seats']['hole'][hand['seat_of'][event.name]] = event.hand
+
+    def on_StreetDealt(self, event):
+        if self.hand is not None:
+            self.hand['board'] = event.community_cards
+            self.hand['street'] = STAGES.index(event.stage)
+
+    def on_ActionTaken(self, event):
+        hand = self.hand
+        if hand is not None:
+            hand['actions'].append((hand['seat_of'][event.name], hand['street'], ACTION_CODES[event.action],
+                                    event.amount, event.pot))
+
+    def on_PotWon(self, event):
+        if self.hand is not None:
+            self.hand['seats']['won'][self.hand['seat_of'][event.name]] = 1
+            self.hand['pot'] = event.pot
+
+    def on_Showdown(self, event):
+        hand = self.hand
+        if hand is not None:
+            for name in event.players:
+                hand['seats']['showdown'][hand['seat_of'][name]] = 1
+            for name in event.winners:
+                hand['seats']['won'][hand['seat_of'][name]] = 1
+            hand['pot'] = event.pot
+            hand['showdown'] = True
+
+    def on_Stacks(self, event):
+        hand = self.hand
+        if hand is None:
+            return
+        for name, stack in event.stacks:
+            hand['seats']['end_stack'][hand['seat_of'][name]] = stack
+
+        header = np.zeros(1, dtype=HAND)
+        header['round'] = self.round
+        header['dealer'] = hand['dealer']
+        header['seats'] = len(hand['seats'])
+        header['actions'] = len(hand['actions'])
+        header['pot'] = hand['pot']
+        header['board'] = hand['board'] + [NO_CARD] * (5 - len(hand['board']))
+        header['showdown'] = hand['showdown']
+
+        self.chunks += [HAND_TAG, header.tobytes(), hand['seats'].tobytes(),
+                        np.array(hand['actions'], dtype=ACTION).tobytes()]
+        self.hand = None
+        self.buffered_hands += 1
+        if self.buffered_hands >= self.buffer_size:
+            self.flush()
+
+    def player(self, name):
+        """Returns the player number for `name`, defining it in the stream the first time."""
+        number = self.players.get(name)
+        if number is None:
+            number = self.players[name] = len(self.players)
+            encoded = name.encode()
+            self.chunks += [NAME_TAG, bytes([len(encoded)]), encoded]
+        return number
+
+    def flush(self):
+        if self.chunks:
+            with open(self.path, 'ab') as file:
+                file.write(b''.join(self.chunks))
+            self.chunks.clear()
+        self.buffered_hands = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HandHistory:
+    """
+    Read-only, memory-mapped view of a hand history file. The file is
+    indexed once on opening: a walk over the chunk headers that records
+    where every hand starts. A partly written last chunk is ignored.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} hand history.")
+
+        self.names = []
+        offsets, seat_counts, action_counts = [], [], []
+        offset, size = HEADER.size, len(self.data)
+        while offset < size:
+            tag = self.data[offset:offset + 1]
+            if tag == NAME_TAG:
+                if offset + 2 > size:
+                    break
+                end = offset + 2 + self.data[offset + 1]
+                if end > size:
+                    break
+                self.names.append(self.data[offset + 2:end].decode())
+                offset = end
+            elif tag == HAND_TAG:
+                if offset + 1 + HAND.itemsize > size:
+                    break
+                num_seats, num_actions = HAND_COUNTS.unpack_from(self.data, offset + 1)
+                end = offset + 1 + HAND.itemsize + num_seats * SEAT.itemsize + num_actions * ACTION.itemsize
+                if end > size:
+                    break
+                offsets.append(offset + 1)
+                seat_counts.append(num_seats)
+                action_counts.append(num_actions)
+                offset = end
+            else:
+                raise ValueError(f"{path} is corrupt at byte {offset}.")
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.seat_counts = np.array(seat_counts, dtype=np.int64)
+        self.action_counts = np.array(action_counts, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        """Decodes hand number `index` (in recording order)."""
+        offset = int(self.offsets[index])
+        header = np.frombuffer(self.data, HAND, 1, offset)[0]
+        offset += HAND.itemsize
+        seats = np.frombuffer(self.data, SEAT, int(header['seats']), offset)
+        offset += seats.nbytes
+        actions = np.frombuffer(self.data, ACTION, int(header['actions']), offset)
+
+        board = [int(card) for card in header['board'] if card != NO_CARD]
+        return Hand(
+            int(header['round']), int(header['dealer']), int(header['pot']), board, bool(header['showdown']),
+            [Seat(self.names[seat['player']], seat['hole'].tolist(), int(seat['start_stack']),
+                  int(seat['end_stack']), bool(seat['won']), bool(seat['showdown'])) for seat in seats],
+            [HandAction(*action) for action in actions.tolist()],
+        )
+
+    def __iter__(self):
+        """Yields every hand in recording order."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def columns(self):
+        """
+        Gathers the whole file into three structured arrays, for bulk stats:
+        hands (HAND fields), seats (SEAT fields plus 'hand') and actions
+        (ACTION fields plus 'hand'), where 'hand' is the hand's index.
+        """
+        buffer = np.frombuffer(self.data, dtype=np.uint8)
+        hands = self._gather(buffer, self.offsets, HAND)
+
+        seat_offsets = np.repeat(self.offsets + HAND.itemsize, self.seat_counts)
+        seat_offsets += self._positions(self.seat_counts) * SEAT.itemsize
+        action_offsets = np.repeat(self.offsets + HAND.itemsize + self.seat_counts * SEAT.itemsize,
+                                   self.action_counts)
+        action_offsets += self._positions(self.action_counts) * ACTION.itemsize
+
+        hand_numbers = np.arange(len(self))
+        seats = self._with_hand(self._gather(buffer, seat_offsets, SEAT), np.repeat(hand_numbers, self.seat_counts))
+        actions = self._with_hand(self._gather(buffer, action_offsets, ACTION),
+                                  np.repeat(hand_numbers, self.action_counts))
+        return hands, seats, actions
+
+    @staticmethod
+    def _positions(counts):
+        # 0, 1, ..., count - 1 for every group, laid end to end
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        return np.arange(counts.sum()) - starts
+
+    @staticmethod
+    def _gather(buffer, offsets, dtype):
+        rows = buffer[offsets[:, None] + np.arange(dtype.itemsize)]
+        return np.ascontiguousarray(rows).view(dtype).reshape(len(offsets))
+
+    @staticmethod
+    def _with_hand(records, hand_numbers):
+        dtype = np.dtype(records.dtype.descr + [('hand', '<i8')])
+        combined = np.empty(len(records), dtype=dtype)
+        for field in records.dtype.names:
+            combined[field] = records[field]
+        combined['hand'] = hand_numbers
+        return combined
+
+    def close(self):
+        self.data.close()
+
+
+def replay_deck(hand):
+    """
+    The card order that deals `hand` again: hole cards seat by seat, then the
+    board, then the cards nobody saw (PokerDeck deals from the end).
+    """
+    dealt = [card for seat in hand.seats for card in seat.hole] + hand.board
+    unseen = [card for card in DECK if card not in dealt]
+    return unseen + dealt[::-1]
+
+
+def replay_hand(hand, sink=None):
+    """
+    Plays a recorded Hand through the engine again, answering each decision
+    with the recorded action, and returns the bots. Raises ValueError if the
+    engine ever asks someone other than the recorded player to act, or the
+    final stacks differ from the recording.
+    """
+    from deck import shared_evaluator
+    from main import play_round_steps
+    from mechanics import PokerDeck
+
+    if sink is None:
+        sink = ConsoleSink()
+    bots = [PokerBot(seat.name, None, stack=seat.start_stack) for seat in hand.seats]
+    steps = play_round_steps(PokerDeck(replay_deck(hand)), bots, shared_evaluator, hand.dealer, sink)
+
+    actions = iter(hand.actions)
+    try:
+        game_state = next(steps)
+        while True:
+            action = next(actions, None)
+            if action is None or game_state.bot is not bots[action.seat] or \
+                    game_state.stage != STAGES[action.street]:
+                raise ValueError(f"Replay diverged from the recording in round {hand.round}.")
+            if action.action == Action.RAISE:
+                # Recorded raises hold the chips placed; ask for the raise that places them again
+                amount = action.amount - game_state.minimum_bet + game_state.money_committed
+            else:
+                amount = action.amount
+            game_state = steps.send((Action(action.action), amount))
+    except StopIteration:
+        pass
+
+    if [bot.stack for bot in bots] != [seat.end_stack for seat in hand.seats]:
+        raise ValueError(f"Replay of round {hand.round} ended with different stacks.")
+    sink.emit(Stacks([(bot.name, bot.stack) for bot in bots]))
+    return bots
+
+
+def format_stats(history):
+    """Per-player hands, win rate, showdown rate and chips won, from the column arrays."""
+    hands, seats, actions = history.columns()
+    lines = [f"{len(hands)} hands, {len(actions)} actions, {os.path.getsize(history.path)} bytes",
+             f"{'Player':<16}{'Hands':>9}{'Win %':>8}{'SD %':>8}{'Chips':>10}"]
+    for number, name in enumerate(history.names):
+        mine = seats[seats['player'] == number]
+        if not len(mine):
+            continue
+        chips = int(mine['end_stack'].astype(np.int64).sum() - mine['start_stack'].astype(np.int64).sum())
+        lines.append(f"{name:<16}{len(mine):>9}{100 * mine['won'].mean():>8.1f}"
+                     f"{100 * mine['showdown'].mean():>8.1f}{chips:>10}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record, summarise and replay binary hand histories.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="play games headless and record them")
+    record.add_argument('path')
+    record.add_argument('--games', type=int, default=10)
+    record.add_argument('--rounds', type=int, default=50, help="hands per game")
+    stats = commands.add_parser('stats', help="summarise a history file")
+    stats.add_argument('path')
+    replay = commands.add_parser('replay', help="replay one recorded hand to the console")
+    replay.add_argument('path')
+    replay.add_argument('--hand', type=int, default=0, help="hand index in the file")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from main import run_texas_holdem
+        with HandHistorySink(args.path) as sink:
+            for _ in range(args.games):
+                run_texas_holdem(args.rounds, sink=sink)
+        print(format_stats(HandHistory(args.path)))
+    elif args.command == 'stats':
+        print(format_stats(HandHistory(args.path)))
+    else:
+        replay_hand(HandHistory(args.path)[args.hand])
@@ -0,0 +1,298 @@
+"""
+Lookup-table hand evaluator for 5, 6 and 7 card hands.
+
+Ranks follow the Treys convention: 1 is a royal flush and 7462 the worst high
+card. Instead of scoring every five-card subset, a hand is scored with a
+single table lookup:
+
+- Flushes are looked up by the 13-bit rank mask of the flush suit.
+- Everything else is looked up by a sum of per-rank keys, chosen so that every
+  multiset of up to seven ranks (at most four of a kind) has a unique sum.
+
+The tables also remember which five cards make the best hand, so showdown
+display and hand-type labelling need no combination loop either.
+
+Building the tables takes about half a second, so the first import saves them
+to disk and every later import loads them instead, memory-mapping the large
+seven-card array. All evaluators in a process share these module-level
+tables.
+"""
+import argparse
+import os
+
+import numpy as np
+from itertools import combinations, combinations_with_replacement
+
+from cards import card_rank, card_suit
+
+MAX_STRAIGHT_FLUSH = 10
+MAX_FOUR_OF_A_KIND = 166
+MAX_FULL_HOUSE = 322
+MAX_FLUSH = 1599
+MAX_STRAIGHT = 1609
+MAX_THREE_OF_A_KIND = 2467
+MAX_TWO_PAIR = 3325
+MAX_PAIR = 6185
+MAX_HIGH_CARD = 7462
+
+HAND_CLASSES = [
+    (1, "Royal Flush"),
+    (MAX_STRAIGHT_FLUSH, "Straight Flush"),
+    (MAX_FOUR_OF_A_KIND, "Four of a Kind"),
+    (MAX_FULL_HOUSE, "Full House"),
+    (MAX_FLUSH, "Flush"),
+    (MAX_STRAIGHT, "Straight"),
+    (MAX_THREE_OF_A_KIND, "Three of a Kind"),
+    (MAX_TWO_PAIR, "Two Pair"),
+    (MAX_PAIR, "One Pair"),
+    (MAX_HIGH_CARD, "High Card"),
+]
+
+# Built tables are saved next to this module and loaded on later imports
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'handrank_tables.npz')
+RANK7_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'handrank_rank7.npy')
+TABLE_VERSION = 1
+
+# Rank keys whose sums are unique for any seven ranks with at most four of each
+RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+MAX_KEY_SUM = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11]
+
+CARD_KEYS = [RANK_KEYS[card >> 2] for card in range(52)]
+CARD_BITS = [1 << (card >> 2) for card in range(52)]
+
+# Suit counts packed into 3-bit fields; one table lookup finds the flush suit (or -1)
+CARD_SUIT_BITS = [1 << (3 * (card & 3)) for card in range(52)]
+FLUSH_SUIT = [next((suit for suit in range(4) if (packed >> (3 * suit)) & 7 >= 5), -1)
+              for packed in range(1 << 12)]
+
+# Straights from ace-high down to the wheel, as 13-bit rank masks
+STRAIGHTS = [0b11111 << high for high in range(8, -1, -1)] + [0b1000000001111]
+
+
+def _masks_with_bits(count):
+    """All 13-bit rank masks with `count` bits set, strongest (highest) first."""
+    masks = [sum(1 << rank for rank in ranks) for ranks in combinations(range(13), count)]
+    return sorted(masks, reverse=True)
+
+
+def _ranks_desc(exclude=()):
+    return [rank for rank in range(12, -1, -1) if rank not in exclude]
+
+
+def _five_card_tables():
+    """
+    Ranks every distinct five-card hand in the Treys order.
+    Returns {rank mask: rank} for flushes and {sorted ranks: rank} for the rest.
+    """
+    flush = {}
+    unsuited = {}
+
+    for rank, mask in enumerate(STRAIGHTS, start=1):
+        flush[mask] = rank
+        unsuited[tuple(r for r in range(13) if mask >> r & 1)] = MAX_FLUSH + rank
+
+    high_cards = [mask for mask in _masks_with_bits(5) if mask not in STRAIGHTS]
+    for offset, mask in enumerate(high_cards, start=1):
+        flush[mask] = MAX_FULL_HOUSE + offset
+        unsuited[tuple(r for r in range(13) if mask >> r & 1)] = MAX_PAIR + offset
+
+    def add(start, hands):
+        for offset, ranks in enumerate(hands, start=start + 1):
+            unsuited[tuple(sorted(ranks))] = offset
+
+    add(MAX_STRAIGHT_FLUSH, ([quad] * 4 + [kicker]
+                             for quad in _ranks_desc() for kicker in _ranks_desc((quad,))))
+    add(MAX_FOUR_OF_A_KIND, ([trips] * 3 + [pair] * 2
+                             for trips in _ranks_desc() for pair in _ranks_desc((trips,))))
+    add(MAX_STRAIGHT, ([trips] * 3 + list(kickers)
+                       for trips in _ranks_desc()
+                       for kickers in combinations(_ranks_desc((trips,)), 2)))
+    add(MAX_THREE_OF_A_KIND, ([high] * 2 + [low] * 2 + [kicker]
+                              for high, low in combinations(_ranks_desc(), 2)
+                              for kicker in _ranks_desc((high, low))))
+    add(MAX_TWO_PAIR, ([pair] * 2 + list(kickers)
+                       for pair in _ranks_desc()
+                       for kickers in combinations(_ranks_desc((pair,)), 3)))
+
+    return flush, unsuited
+
+
+def _build_tables():
+    """
+    Extends the five-card tables to six and seven cards. A bigger hand is as
+    good as its best hand with one card removed, so each size builds on the
+    previous one. Every entry stores (rank, best five-card key).
+    """
+    five_flush, five_unsuited = _five_card_tables()
+
+    flush = [None] * (1 << 13)
+    for mask, rank in five_flush.items():
+        flush[mask] = (rank, mask)
+    for count in (6, 7):
+        for mask in _masks_with_bits(count):
+            flush[mask] = min(flush[mask & ~(1 << rank)] for rank in range(13) if mask >> rank & 1)
+
+    unsuited = {5: {}, 6: {}, 7: {}}
+    five_ranks = {}
+    for ranks, rank in five_unsuited.items():
+        key = sum(RANK_KEYS[r] for r in ranks)
+        unsuited[5][key] = (rank, key)
+        five_ranks[key] = ranks
+
+    for size in (6, 7):
+        smaller = unsuited[size - 1]
+        for ranks in combinations_with_replacement(range(13), size):
+            if any(ranks.count(r) > 4 for r in set(ranks)):
+                continue
+            key = sum(RANK_KEYS[r] for r in ranks)
+            unsuited[size][key] = min(smaller[key - RANK_KEYS[r]] for r in set(ranks))
+
+    return flush, unsuited, five_ranks
+
+
+def _tables_to_arrays(flush, unsuited, five_ranks):
+    """Packs the lookup tables into integer arrays for saving."""
+    arrays = {'version': np.array(TABLE_VERSION),
+              'flush': np.array([entry or (0, 0) for entry in flush], dtype=np.int32),
+              'five_ranks': np.array([(key, *ranks) for key, ranks in five_ranks.items()], dtype=np.int32)}
+    for size, table in unsuited.items():
+        arrays[f'unsuited{size}'] = np.array([(key, rank, best) for key, (rank, best) in table.items()],
+                                             dtype=np.int32)
+    return arrays
+
+
+def _arrays_to_tables(arrays):
+    """Unpacks arrays written by _tables_to_arrays back into lookup tables."""
+    flush = [entry if entry[0] else None for entry in zip(*arrays['flush'].T.tolist())]
+    unsuited = {}
+    for size in (5, 6, 7):
+        keys, ranks, best = arrays[f'unsuited{size}'].T.tolist()
+        unsuited[size] = dict(zip(keys, zip(ranks, best)))
+    five_ranks = arrays['five_ranks']
+    five_ranks = dict(zip(five_ranks[:, 0].tolist(), zip(*five_ranks[:, 1:].T.tolist())))
+    return flush, unsuited, five_ranks
+
+
+def build_tables(path=TABLE_PATH, rank7_path=RANK7_PATH):
+    """
+    Builds the lookup tables from scratch and saves them, so later processes
+    can load them instead. Returns the tables and the dense seven-card array.
+    """
+    tables = _build_tables()
+    arrays = _tables_to_arrays(*tables)
+
+    rank7 = np.zeros(MAX_KEY_SUM + 1, dtype=np.int16)
+    rank7[arrays['unsuited7'][:, 0]] = arrays['unsuited7'][:, 1]
+
+    # Write to temporary names and rename, so a process loading concurrently
+    # never sees half a file
+    try:
+        temporary = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, path)
+        temporary = f"{rank7_path}.{os.getpid()}.tmp.npy"
+        np.save(temporary, rank7)
+        os.replace(temporary, rank7_path)
+    except OSError:
+        pass  # Read-only install: keep the tables in memory only
+
+    return tables, rank7
+
+
+def load_tables(path=TABLE_PATH, rank7_path=RANK7_PATH):
+    """
+    Loads the saved lookup tables, memory-mapping the large seven-card array
+    so worker processes share it. Builds and saves them if they are missing
+    or were written by another table version.
+    """
+    try:
+        with np.load(path) as arrays:
+            if int(arrays['version']) == TABLE_VERSION:
+                return _arrays_to_tables(arrays), np.load(rank7_path, mmap_mode='r')
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_tables(path, rank7_path)
+
+
+(FLUSH_TABLE, UNSUITED_TABLES, FIVE_CARD_RANKS), RANK7 = load_tables()
+
+FLUSH_RANKS = np.array([entry[0] if entry else 0 for entry in FLUSH_TABLE], dtype=np.int16)
+
+CARD_KEYS_NP = np.array(CARD_KEYS, dtype=np.int32)
+CARD_BITS_NP = np.array(CARD_BITS, dtype=np.int32)
+CARD_SUIT_BITS_NP = np.array(CARD_SUIT_BITS, dtype=np.int32)
+FLUSH_SUIT_NP = np.array(FLUSH_SUIT, dtype=np.int8)
+
+
+def _lookup(cards):
+    """Returns the (rank, best five key) table entry and flush suit for 5-7 cards."""
+    key = 0
+    packed = 0
+    for card in cards:
+        key += CARD_KEYS[card]
+        packed += CARD_SUIT_BITS[card]
+
+    suit = FLUSH_SUIT[packed]
+    if suit >= 0:
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= CARD_BITS[card]
+        return FLUSH_TABLE[mask], suit
+
+    return UNSUITED_TABLES[len(cards)][key], -1
+
+
+def evaluate(cards):
+    """Scores a 5, 6 or 7 card hand. Lower is better, 1 is a royal flush."""
+    return _lookup(cards)[0][0]
+
+
+def best_five(cards):
+    """Returns the five cards that make the best hand out of 5-7 cards."""
+    (_, best_key), suit = _lookup(cards)
+
+    if suit >= 0:
+        return [card for card in cards if card_suit(card) == suit and best_key >> card_rank(card) & 1][:5]
+
+    # Pick cards rank by rank until the best five ranks are used up
+    needed = list(FIVE_CARD_RANKS[best_key])
+    chosen = []
+    for card in cards:
+        if card_rank(card) in needed:
+            needed.remove(card_rank(card))
+            chosen.append(card)
+    return chosen
+
+
+def hand_class(rank):
+    """Converts a rank into its human-readable hand type."""
+    for max_rank, name in HAND_CLASSES:
+        if rank <= max_rank:
+            return name
+    return "Unknown Hand"
+
+
+def evaluate_batch(cards):
+    """Scores an (N, 7) array of cards in bulk and returns N ranks."""
+    cards = np.asarray(cards, dtype=np.intp)
+    ranks = RANK7[CARD_KEYS_NP[cards].sum(axis=1)].astype(np.int32)
+
+    flush_suits = FLUSH_SUIT_NP[CARD_SUIT_BITS_NP[cards].sum(axis=1)]
+    flush_rows = np.flatnonzero(flush_suits >= 0)
+
+    if len(flush_rows):
+        flush_cards = cards[flush_rows]
+        in_suit = (flush_cards & 3) == flush_suits[flush_rows, None]
+        masks = np.where(in_suit, CARD_BITS_NP[flush_cards], 0).sum(axis=1)
+        ranks[flush_rows] = FLUSH_RANKS[masks]
+
+    return ranks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the hand evaluator tables.")
+    parser.parse_args()
+
+    build_tables()
+    print(f"Wrote {TABLE_PATH} and {RANK7_PATH}")
@@ -1,30 +1,81 @@
+from enum import IntEnum
+
+
+class Action(IntEnum):
+    """What a bot does on its turn."""
+    FOLD = 0
+    CHECK = 1
+    CALL = 2
+    RAISE = 3
+    ALLIN = 4
+
+
+class GameState:
+    """
+    The table as seen by the bot about to act. The engine keeps one per hand
+    and updates it in place before every decision, so strategies must read
+    it during decide() and not hold on to it. `deadline` is the
+    time.perf_counter() time by which the decision is due, or None;
+    `decision_time` is the per-decision budget the engine derives it from.
+    """
+    __slots__ = ('bot', 'stage', 'community_cards', 'pot', 'minimum_bet', 'money_committed', 'num_opponents',
+                 'deadline', 'decision_time')
+
+    def __init__(self, community_cards=None, stage="Pre-flop", decision_time=None):
+        self.bot = None
+        self.stage = stage
+        self.community_cards = community_cards if community_cards is not None else []
+        self.pot = 0
+        self.minimum_bet = 0
+        self.money_committed = 0
+        self.num_opponents = 1
+        self.deadline = None
+        self.decision_time = decision_time
+
+
 class PokerBot:
+    __slots__ = ('name', 'strategy', 'hand', 'context', 'stack', 'current_bet', 'position')
+
     def __init__(self, name, strategy, stack=100):
         self.name = name
         self.strategy = strategy
         self.hand = []
+        self.context = None  # HandContext for the hand in progress
         self.stack = stack
         self.current_bet = 0
+        self.position = None
 
     def set_hand(self, hand):
         self.hand = hand
 
-    def decide_action(self, game_state, minimum_bet):
-        action = self.strategy.decide(game_state, self.hand)
+    def decide_action(self, game_state, minimum_bet, deadline=None):
+        """
+        Asks the strategy for a decision, which is either an Action or an
+        (Action, amount) tuple, and turns it into what the table executes.
+        `deadline` (a time.perf_counter() time) bounds how long the strategy
+        may think; it answers with its best estimate so far when it passes.
+        """
+        game_state.deadline = deadline
+        return self.table_action(self.strategy.decide(game_state, self.hand), minimum_bet)
+
+    def table_action(self, action, minimum_bet):
+        """Turns a decision made elsewhere (e.g. by a remote client) into what the table executes."""
+        if action.__class__ is tuple:
+            action = action[0]
 
-        if action == 'fold':
-            return 'fold', 0
-        elif action == 'call':
+        if action == Action.FOLD:
+            return Action.FOLD, 0
+        elif action == Action.CALL:
             call_amount = min(minimum_bet - self.current_bet, self.stack)
-            return 'call', call_amount
-        elif action == 'raise':
+            return Action.CALL, call_amount
+        elif action == Action.RAISE:
             raise_amount = min(minimum_bet * 2, self.stack)
-            return 'raise', raise_amount
-        elif action == 'allin':
+            return Action.RAISE, raise_amount
+        elif action == Action.ALLIN:
             raise_amount = self.stack
-            return 'raise', raise_amount
+            return Action.RAISE, raise_amount
         else:
-            return 'check', 0
+            return Action.CHECK, 0
 
     def bet(self, amount):
         if amount > self.stack:
@@ -37,4 +88,4 @@ class PokerBot:
         self.current_bet = 0
 
     def __repr__(self):
-        return f"{self.name} (Chips: {self.stack})"
\ No newline at end of file
+        return f"{self.name} (Chips: {self.stack})"
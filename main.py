@@ -1,18 +1,12 @@
+from time import perf_counter
+
 from mechanics import PokerDeck
-from deck import PokerHandEvaluator
-from logic import PokerBot
+from deck import shared_evaluator
+from hand_context import HandContext
+from logic import Action, GameState, PokerBot
 from strategies import AggressiveStrategy, ConservativeStrategy, RandomStrategy, AllIn
-
-
-# === DISPLAY FUNCTIONS ===
-def display_hand(bot):
-    """Displays the bot's hand in a formatted way."""
-    print(f"{bot.name} has: {', '.join(bot.hand)}")
-
-
-def display_community_cards(community_cards):
-    """Displays the community cards in a formatted way."""
-    print("\nCommunity Cards: " + (", ".join(community_cards) if community_cards else "None"))
+from events import (ActionTaken, BlindPosted, ConsoleSink, GameOver, HandStarted, HoleCards, PotWon,
+                    RoundStarted, Showdown, Stacks, StreetDealt)
 
 
 # === POSITION ASSIGNMENT FUNCTION ===
@@ -31,23 +25,63 @@ def assign_positions(bots):
 
 
 # === BETTING ROUND FUNCTION ===
-def betting_round(bots, minimum_bet=10, community_cards=[], stage="Pre-flop", big_blind_position=0):
+MAX_RAISES = {'Pre-flop': 3, 'Flop': 2, 'Turn': 1, 'River': 1}
+
+
+def drive(steps):
+    """
+    Runs one of the *_steps generators to completion, answering every
+    decision it yields by asking the bot directly, and returns its result.
+    """
+    try:
+        game_state = next(steps)
+        while True:
+            decision = game_state.bot.decide_action(game_state, game_state.minimum_bet, game_state.deadline)
+            game_state = steps.send(decision)
+    except StopIteration as finished:
+        return finished.value
+
+
+def betting_round(bots, minimum_bet=10, community_cards=[], stage="Pre-flop", big_blind_position=0, sink=None,
+                  game_state=None):
     """
     Handles a full betting round, ensuring that bots act in correct order,
     follow the betting rules, and avoid miscommunications.
+    Every blind and action is reported to `sink` (the console by default).
+    `game_state` is updated in place before each decision; play_hand passes
+    one per hand so the inner loop allocates nothing per action.
+    Returns the chips put in this round and the bots still in the hand
+    (including any that are all-in). The caller awards the pot.
+    """
+    if game_state is None:
+        game_state = GameState()
+    return drive(betting_round_steps(bots, minimum_bet, community_cards, stage, big_blind_position, sink, game_state))
+
+
+def betting_round_steps(bots, minimum_bet, community_cards, stage, big_blind_position, sink, game_state):
+    """
+    betting_round as a generator: yields `game_state` whenever game_state.bot
+    must act and expects its (Action, amount) decision to be sent back.
     """
-    MAX_RAISES = {'Pre-flop': 3, 'Flop': 2, 'Turn': 1, 'River': 1}
+    if sink is None:
+        sink = ConsoleSink()
+    game_state.community_cards = community_cards
+    game_state.stage = stage
+
     raise_limit = MAX_RAISES.get(stage, 2)
 
     pot = 0
     active_bots = [bot for bot in bots if bot.stack > 0]
+    num_active = len(active_bots)
+    folded = [False] * num_active
+    remaining = num_active
     current_bet = minimum_bet
     raise_count = 0
 
     # Assign blinds
-    if len(active_bots) >= 2:
-        small_blind_position = (big_blind_position - 1) % len(active_bots)
-        big_blind_position = big_blind_position % len(active_bots)
+    if num_active >= 2:
+        small_blind_position = (big_blind_position - 1) % num_active
+        big_blind_position = big_blind_position % num_active
 
         small_blind = active_bots[small_blind_position]
         big_blind = active_bots[big_blind_position]
@@ -55,49 +89,51 @@ def betting_round(bots, minimum_bet=10, community_cards=[], stage="Pre-flop", bi
         small_blind.bet(minimum_bet // 2)  # Small Blind
         big_blind.bet(minimum_bet)  # Big Blind
 
-        print(f"{small_blind.name} posts the Small Blind ({minimum_bet // 2} chips).")
-        print(f"{big_blind.name} posts the Big Blind ({minimum_bet} chips).")
+        sink.emit(BlindPosted(small_blind.name, 'Small', minimum_bet // 2))
+        sink.emit(BlindPosted(big_blind.name, 'Big', minimum_bet))
 
         pot += (minimum_bet + minimum_bet // 2)
 
     # Betting starts **AFTER** the Big Blind
-    starting_index = (big_blind_position + 1) % len(active_bots)
-    betting_order = active_bots[starting_index:] + active_bots[:starting_index]
+    starting_index = (big_blind_position + 1) % num_active if num_active else 0
 
-    while len(active_bots) > 1:
+    while remaining > 1:
         betting_complete = True  # Assume betting is complete unless a raise occurs
-        bots_to_remove = []
 
-        for bot in betting_order:
-            if bot.stack <= 0:
-                continue  # Skip bots who are all-in
+        for offset in range(num_active):
+            index = (starting_index + offset) % num_active
+            bot = active_bots[index]
+            if folded[index] or bot.stack <= 0:
+                continue  # Skip bots who are all-in or have already folded
 
-            game_state = {
-                'bot': bot,
-                'community_cards': community_cards,
-                'pot': pot,
-                'minimum_bet': current_bet,
-                'money_committed': bot.current_bet,
-                'num_opponents': len(active_bots) - 1
-            }
+            game_state.bot = bot
+            game_state.pot = pot
+            game_state.minimum_bet = current_bet
+            game_state.money_committed = bot.current_bet
+            game_state.num_opponents = remaining - 1
 
-            action, amount = bot.decide_action(game_state, current_bet)
+            if game_state.decision_time is not None:
+                game_state.deadline = perf_counter() + game_state.decision_time
+            action, amount = yield game_state
 
             # 🏳️ **FOLD LOGIC**
-            if action == 'fold':
-                print(f"{bot.name} 🏳️ folds.")
-                bots_to_remove.append(bot)
+            if action == Action.FOLD:
+                sink.emit(ActionTaken(bot.name, 'fold', 0, pot))
+                folded[index] = True
+                remaining -= 1
+                if remaining == 1:
+                    break  # Nobody is left to act against
                 continue  # Move to the next bot
 
             # 🔵 **CALL LOGIC**
-            elif action == 'call':
+            elif action == Action.CALL:
                 call_amount = min(current_bet - bot.current_bet, bot.stack)  # Ensure it's within stack
                 placed_bet = bot.bet(call_amount)
                 pot += placed_bet
-                print(f"{bot.name} 🔵 calls with {placed_bet} chips. (Pot: {pot})")
+                sink.emit(ActionTaken(bot.name, 'call', placed_bet, pot))
 
             # 🔺 **RAISE LOGIC**
-            elif action == 'raise' and raise_count < raise_limit:
+            elif action == Action.RAISE and raise_count < raise_limit:
                 raise_amount = max(amount, minimum_bet)
                 if raise_amount > bot.stack:
                     raise_amount = bot.stack  # Go all-in if not enough
@@ -110,22 +146,11 @@ def betting_round(bots, minimum_bet=10, community_cards=[], stage="Pre-flop", bi
                     current_bet = total_raise
                     raise_count += 1
                     betting_complete = False  # Restart the betting cycle
-                    print(f"{bot.name} 🔺 raises with {placed_bet} chips. (Pot: {pot})")
+                    sink.emit(ActionTaken(bot.name, 'raise', placed_bet, pot))
 
             # 🚫 **DEFAULT TO CHECK**
             else:
-                print(f"{bot.name} ✅ checks.")
-
-        # Remove folded bots
-        for bot in bots_to_remove:
-            active_bots.remove(bot)
-
-        # If only one player remains, they instantly win the pot
-        if len(active_bots) == 1:
-            winner = active_bots[0]
-            print(f"\n🏆 {winner.name} wins the pot of {pot} chips! (All others folded)")
-            winner.stack += pot
-            return pot, []
+                sink.emit(ActionTaken(bot.name, 'check', 0, pot))
 
         if betting_complete:
             break  # Exit loop if no raises happened
@@ -134,85 +159,169 @@ def betting_round(bots, minimum_bet=10, community_cards=[], stage="Pre-flop", bi
     for bot in bots:
         bot.reset_bet()
 
-    return pot, active_bots
+    if remaining == num_active:
+        return pot, bots
+    folded_bots = [bot for bot, has_folded in zip(active_bots, folded) if has_folded]
+    return pot, [bot for bot in bots if bot not in folded_bots]
+
+
+
+# === SHOWDOWN FUNCTION ===
+def showdown(players, community_cards, pot, evaluator, sink):
+    """
+    Scores every live player's seven cards once, then splits the pot evenly
+    between everyone tied for the best hand (odd chips go to the earliest
+    seats). Best hands and the hand-type label are only worked out when the
+    sink displays them. Returns the winners.
+    """
+    scores = [evaluator.evaluate_hand(bot.hand, community_cards) for bot in players]
+    best_score = min(scores)
+    winners = [bot for bot, score in zip(players, scores) if score == best_score]
+
+    share, odd_chips = divmod(pot, len(winners))
+    for seat, bot in enumerate(winners):
+        bot.stack += share + (1 if seat < odd_chips else 0)
+
+    if sink.detailed:
+        hand_type = evaluator.evaluate_hand_type(winners[0].hand + community_cards)
+        best_hands = [evaluator.determine_best_five(bot.hand + community_cards) for bot in winners]
+    else:
+        hand_type = best_hands = None
 
+    sink.emit(Showdown([bot.name for bot in winners], pot, hand_type, best_hands, [bot.name for bot in players]))
+    return winners
 
 
 # === PLAY HAND FUNCTION ===
-def play_hand(deck, bots, evaluator, big_blind_position):
+def play_hand(deck, bots, evaluator, big_blind_position, sink=None, decision_time=None):
+    """
+    Plays one hand. `decision_time` optionally gives every decision a time
+    budget in seconds.
+    """
+    return drive(play_hand_steps(deck, bots, evaluator, big_blind_position, sink, decision_time))
+
+
+def play_hand_steps(deck, bots, evaluator, big_blind_position, sink=None, decision_time=None):
+    """play_hand as a generator that yields every decision (see betting_round_steps)."""
+    if sink is None:
+        sink = ConsoleSink()
     community_cards = []
+    game_state = GameState(community_cards, decision_time=decision_time)
     stages = ['Pre-flop', 'Flop', 'Turn', 'River']
     cards_to_deal = [0, 3, 1, 1]
 
     # Deal hole cards **after** blinds are posted
     for bot in bots:
         bot.set_hand(deck.deal(2))
+        bot.context = HandContext(bot.hand)
 
     pot = sum(bot.current_bet for bot in bots)  # Start pot with blinds
+    live_bots = bots  # Bots that have not folded this hand
 
     for stage, num_cards in zip(stages, cards_to_deal):
         if num_cards > 0:
-            community_cards.extend(deck.deal(num_cards))
+            new_cards = deck.deal(num_cards)
+            community_cards.extend(new_cards)
+            for bot in live_bots:
+                bot.context.add_cards(new_cards)
 
-        print(f"\n===== {stage} =====")
-        display_community_cards(community_cards)
+        sink.emit(StreetDealt(stage, list(community_cards)))
 
-        for bot in bots:
-            display_hand(bot)
+        for bot in live_bots:
+            sink.emit(HoleCards(bot.name, bot.hand))
 
         # Betting starts **after** blinds have already been posted
-        pot_round, active_bots = betting_round(
-            bots, minimum_bet=10, community_cards=community_cards, stage=stage, big_blind_position=big_blind_position
+        pot_round, live_bots = yield from betting_round_steps(
+            live_bots, minimum_bet=10, community_cards=community_cards, stage=stage,
+            big_blind_position=big_blind_position, sink=sink, game_state=game_state
         )
         pot += pot_round
 
         # If only one player remains, **end the hand immediately**
-        if len(active_bots) == 1:
-            winner = active_bots[0]
-            print(f"\n🏆 {winner.name} wins the pot of {pot} chips! (Other bots folded)")
+        if len(live_bots) == 1:
+            winner = live_bots[0]
+            sink.emit(PotWon(winner.name, pot, "Other bots folded"))
             winner.stack += pot
             return  # **Skip Turn & River**
 
-    # If multiple players reach showdown, evaluate the best hand
-    best_hands = {}
-    for bot in bots:
-        best_hand, hand_type = evaluator.get_best_hand(bot.hand, community_cards)
-        best_hands[bot] = (best_hand, hand_type)
+    # If multiple players reach showdown, the best hand (or hands) take the pot
+    showdown(live_bots, community_cards, pot, evaluator, sink)
 
-    # Determine the winner based on hand strength
-    winner = min(best_hands, key=lambda bot: evaluator.evaluate_hand(bot.hand, community_cards))
 
-    # Get the winner's best hand and hand type
-    winning_hand, winning_hand_type = best_hands[winner]
+def play_round_steps(deck, bots, evaluator, dealer_position, sink, decision_time=None):
+    """
+    Posts the blinds for the dealer at `dealer_position` and plays the hand,
+    yielding every decision (see betting_round_steps).
+    """
+    sink.emit(HandStarted(dealer_position, [(bot.name, bot.stack) for bot in bots]))
+
+    # Assign blinds before dealing cards
+    small_blind_position = dealer_position
+    big_blind_position = (dealer_position + 1) % len(bots)
+
+    small_blind_amount = 5
+    big_blind_amount = 10
 
-    # Display winning hand details
-    print(f"\n🏆 Winner: {winner.name} with a {winning_hand_type}! ({', '.join(map(str, winning_hand))})")
-    print(f"💰 Wins {pot} chips!")
-    winner.stack += pot
+    bots[small_blind_position].bet(small_blind_amount)
+    bots[big_blind_position].bet(big_blind_amount)
+
+    sink.emit(BlindPosted(bots[small_blind_position].name, 'Small', small_blind_amount))
+    sink.emit(BlindPosted(bots[big_blind_position].name, 'Big', big_blind_amount))
+
+    # Deal hole cards **after** blinds are posted
+    yield from play_hand_steps(deck, bots, evaluator, big_blind_position, sink, decision_time)
 
 
 # === RUN GAME FUNCTION ===
-def run_texas_holdem(rounds=10):
-    bots = [
-        PokerBot("AggressiveBot", AggressiveStrategy(), stack=2000),
-        PokerBot("ConservativeBot", ConservativeStrategy(), stack=2000),
-        PokerBot("AllInBot", AllIn(), stack=2000),
-        PokerBot("RandomBot", RandomStrategy(), stack=2000)
+def create_bots(stack=2000):
+    """Creates the standard line-up of bots."""
+    return [
+        PokerBot("AggressiveBot", AggressiveStrategy(), stack=stack),
+        PokerBot("ConservativeBot", ConservativeStrategy(), stack=stack),
+        PokerBot("AllInBot", AllIn(), stack=stack),
+        PokerBot("RandomBot", RandomStrategy(), stack=stack)
     ]
 
-    evaluator = PokerHandEvaluator()
+
+def run_texas_holdem(rounds=10, sink=None, bots=None, decks=None, decision_time=None, rng=None):
+    """
+    Plays up to `rounds` hands between `bots` (the standard line-up by default).
+    Everything that happens is reported to `sink`, which defaults to console
+    output; pass a NullSink or CountingSink to run headless.
+    `decks` optionally gives a pre-arranged card order for each round, so the
+    same deals can be replayed; otherwise one deck is reset and reused every
+    round, dealing with `rng` (see PokerDeck). `decision_time` caps each
+    decision in seconds.
+    """
+    drive(run_texas_holdem_steps(rounds, sink, bots, decks, decision_time, rng))
+
+
+def run_texas_holdem_steps(rounds=10, sink=None, bots=None, decks=None, decision_time=None, rng=None):
+    """run_texas_holdem as a generator that yields every decision (see betting_round_steps)."""
+    if sink is None:
+        sink = ConsoleSink()
+    if bots is None:
+        bots = create_bots()
+
+    for bot in bots:
+        bot.strategy.sink = sink
+
+    evaluator = shared_evaluator
     dealer_position = 0  # Tracks who is the dealer, rotates every round
+    shuffled_deck = PokerDeck(rng=rng)
+    shuffled_deck.shuffle()
 
     for round_num in range(1, rounds + 1):
         if len(bots) <= 1:  # If only one bot remains, game ends
             break
 
-        print(f"\n==========================")
-        print(f"       ROUND {round_num}     ")
-        print(f"==========================")
+        sink.emit(RoundStarted(round_num))
 
-        deck = PokerDeck()
-        deck.shuffle()
+        if decks is not None:
+            deck = PokerDeck(decks[round_num - 1])
+        else:
+            deck = shuffled_deck
+            deck.reset()
 
         # Remove eliminated bots
         bots = [bot for bot in bots if bot.stack > 0]
@@ -220,35 +329,19 @@ def run_texas_holdem(rounds=10):
         if len(bots) < 2:
             break  # Not enough players to continue
 
-        # Assign blinds before dealing cards
-        small_blind_position = dealer_position % len(bots)
-        big_blind_position = (dealer_position + 1) % len(bots)
-
-        small_blind_amount = 5
-        big_blind_amount = 10
-
-        bots[small_blind_position].bet(small_blind_amount)
-        bots[big_blind_position].bet(big_blind_amount)
-
-        print(f"{bots[small_blind_position].name} posts the Small Blind ({small_blind_amount} chips).")
-        print(f"{bots[big_blind_position].name} posts the Big Blind ({big_blind_amount} chips).")
-
-        # Deal hole cards **after** blinds are posted
-        play_hand(deck, bots, evaluator, big_blind_position)
+        yield from play_round_steps(deck, bots, evaluator, dealer_position % len(bots), sink, decision_time)
 
         dealer_position += 1  # Rotate dealer for next round
 
-        # Display bot standings
-        print("\n💰 Chip Standings:")
-        for bot in bots:
-            print(f"  {bot.name}: {bot.stack} chips")
+        # Report bot standings
+        sink.emit(Stacks([(bot.name, bot.stack) for bot in bots]))
 
     # Determine overall winner
     if len(bots) == 1:
-        print(f"\n🏆 FINAL WINNER: {bots[0].name} with {bots[0].stack} chips!")
+        sink.emit(GameOver(bots[0].name, bots[0].stack, True))
     else:
         overall_winner = max(bots, key=lambda bot: bot.stack)
-        print(f"\n🏆 Overall Winner: {overall_winner.name} with {overall_winner.stack} chips!")
+        sink.emit(GameOver(overall_winner.name, overall_winner.stack, False))
 
 
 # === MAIN EXECUTION ===
@@ -1,18 +1,86 @@
 import random
+from cards import DECK
+
+
+def card_mask(cards):
+    """Returns a bitmask with bit `card` set for every card in `cards`."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
 
 class PokerDeck:
-    def __init__(self):
-        self.suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        self.ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        self.deck = self.create_deck()
+    """
+    A deck that is reused rather than rebuilt. The cards still in the deck
+    are the first `size` entries of `cards`, and dealing swaps cards past
+    that point instead of popping them, so reset() usually only has to move
+    the boundary back. Dead cards (say, the hole cards and board of a
+    simulated spot) are kept out with a bitmask.
+
+    Cards come off the end in a pre-arranged order (`cards`, for replays)
+    until shuffle() is called; after that every card is drawn at random
+    from those left, a partial Fisher-Yates shuffle that only touches the
+    positions it deals. `rng` is anything with a random() method, such as a
+    seeded random.Random; the random module is used by default.
+    """
+    def __init__(self, cards=None, rng=None):
+        # A pre-arranged card order (dealt from the end) lets hands be replayed
+        self.order = list(cards) if cards is not None else self.create_deck()
+        self.cards = list(self.order)
+        self.size = len(self.cards)
+        self.rng = rng if rng is not None else random
+        self.shuffled = False
+        self.dead_mask = 0
+        self.live_size = self.size
 
     def create_deck(self):
-        return [f"{rank} of {suit}" for suit in self.suits for rank in self.ranks]
+        return list(DECK)
 
     def shuffle(self):
-        random.shuffle(self.deck)
+        """Deals at random from now on (also after every reset)."""
+        self.shuffled = True
+
+    def reset(self, dead_mask=0):
+        """
+        Puts every card back except those set in `dead_mask` (see card_mask),
+        without allocating a new deck. With the same mask as last time this
+        only moves the boundary back.
+        """
+        if dead_mask == self.dead_mask:
+            # Dealing only swaps cards within the live part, so it still holds exactly the live cards
+            self.size = self.live_size
+            return
+
+        self.dead_mask = dead_mask
+        if dead_mask:
+            live = [card for card in self.order if not dead_mask >> card & 1]
+            self.cards[:] = live + [card for card in self.order if dead_mask >> card & 1]
+            self.size = len(live)
+        else:
+            self.cards[:] = self.order
+            self.size = len(self.cards)
+        self.live_size = self.size
 
     def deal(self, num_cards):
-        if num_cards > len(self.deck):
+        if num_cards > self.size:
             raise ValueError("Not enough cards left in the deck to deal.")
-        return [self.deck.pop() for _ in range(num_cards)]
\ No newline at end of file
+        cards = self.cards
+        size = self.size
+        if not self.shuffled:
+            self.size = size - num_cards
+            return cards[size - num_cards:size][::-1]
+
+        draw = self.rng.random
+        dealt = []
+        for _ in range(num_cards):
+            # The bias of scaling a 53-bit float to at most 52 positions is negligible
+            pick = int(draw() * size)
+            size -= 1
+            cards[pick], cards[size] = cards[size], cards[pick]
+            dealt.append(cards[size])
+        self.size = size
+        return dealt
+
+    def __len__(self):
+        return self.size
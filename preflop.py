@@ -0,0 +1,113 @@
+"""
+Precomputed pre-flop equity for all 169 starting-hand classes against 1 to 9
+random opponents.
+
+The table is generated offline (python preflop.py) and stored as a compact
+binary file: a small header followed by one uint16 per class and opponent
+count, holding equity scaled to 0-65535. Classes are laid out on a 13x13
+grid: pairs on the diagonal, suited hands above it, offsuit hands below it.
+"""
+import argparse
+import os
+import struct
+from array import array
+
+import numpy as np
+
+from cards import RANKS, card_rank, card_suit, make_card
+from equity import batch_equity
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_equity.bin')
+
+MAGIC = b'PFEQ'
+VERSION = 1
+HEADER = struct.Struct('<4sBBH')  # magic, version, max opponents, classes
+
+NUM_CLASSES = 169
+MAX_OPPONENTS = 9
+SCALE = 65535
+
+_table = None
+
+
+def class_index(hand):
+    """Maps two hole cards to their starting-hand class (0-168)."""
+    high, low = sorted((card_rank(hand[0]), card_rank(hand[1])), reverse=True)
+    if card_suit(hand[0]) == card_suit(hand[1]):
+        return high * 13 + low  # Suited: above the diagonal
+    return low * 13 + high  # Offsuit and pairs: on or below the diagonal
+
+
+def class_name(index):
+    """Names a class like 'AKs', 'AKo' or '77'."""
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    high, low = max(row, col), min(row, col)
+    return f"{RANKS[high]}{RANKS[low]}{'s' if row > col else 'o'}"
+
+
+def class_hand(index):
+    """Returns one concrete pair of hole cards belonging to a class."""
+    row, col = divmod(index, 13)
+    if row > col:
+        return [make_card(row, 0), make_card(col, 0)]
+    return [make_card(col, 0), make_card(row, 1)]
+
+
+def generate_table(num_simulations=20000, seed=0):
+    """
+    Simulates every class against 1-9 opponents. Returns a list of 169 rows of
+    9 equities, where ties share the pot.
+    """
+    rng = np.random.default_rng(seed)
+    table = []
+    for index in range(NUM_CLASSES):
+        hand = class_hand(index)
+        table.append([batch_equity(hand, [], opponents, num_simulations, rng)
+                      for opponents in range(1, MAX_OPPONENTS + 1)])
+    return table
+
+
+def write_table(table, path=TABLE_PATH):
+    """Writes the table to disk in the compact binary format."""
+    values = array('H', (round(equity * SCALE) for row in table for equity in row))
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, MAX_OPPONENTS, NUM_CLASSES))
+        file.write(values.tobytes())
+
+
+def read_table(path=TABLE_PATH):
+    """Reads a table written by write_table into a flat array of uint16 values."""
+    with open(path, 'rb') as file:
+        magic, version, max_opponents, num_classes = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or (max_opponents, num_classes) != (MAX_OPPONENTS, NUM_CLASSES):
+            raise ValueError(f"{path} is not a version {VERSION} pre-flop equity table.")
+        values = array('H')
+        values.frombytes(file.read())
+    return values
+
+
+def preflop_equity(hand, num_opponents=1):
+    """
+    Looks up the all-in equity of two hole cards against `num_opponents`
+    random hands. The table is loaded on first use; opponent counts outside
+    1-9 are clamped.
+    """
+    global _table
+    if _table is None:
+        _table = read_table()
+
+    num_opponents = min(max(num_opponents, 1), MAX_OPPONENTS)
+    return _table[class_index(hand) * MAX_OPPONENTS + num_opponents - 1] / SCALE
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the pre-flop equity table.")
+    parser.add_argument('--simulations', type=int, default=20000, help="simulations per class and opponent count")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=TABLE_PATH)
+    args = parser.parse_args()
+
+    write_table(generate_table(args.simulations, args.seed), args.output)
+    print(f"Wrote {NUM_CLASSES} x {MAX_OPPONENTS} pre-flop equities to {args.output}")
@@ -0,0 +1,215 @@
+"""
+Hot-path timing counters and an optional sampling profiler.
+
+A Profiler wraps the engine's hot paths (hands, betting rounds, bot
+decisions, equity simulations, showdowns and dealing) with
+call counters and timers while it is installed, and puts the original
+functions back when it is removed. Nothing is patched while profiling is
+off, so it costs nothing.
+
+    with Profiler(sample_interval=0.001) as profiler:
+        run_texas_holdem(50, sink=NullSink())
+    print(profiler.report())
+
+Time spent inside a bot's decision (including the equity simulations it
+triggers) is also attributed to that bot.
+"""
+import argparse
+import functools
+import importlib
+import inspect
+import os
+import signal
+from collections import Counter, defaultdict
+from time import perf_counter
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (module, attribute path, phase name)
+HOOKS = [
+    ('main', 'play_hand_steps', 'hand'),
+    ('main', 'betting_round_steps', 'betting_round'),
+    ('logic', 'PokerBot.decide_action', 'decide'),
+    ('deck', 'PokerHandEvaluator.monte_carlo_simulation', 'monte_carlo'),
+    ('deck', 'PokerHandEvaluator.sequential_simulation', 'sequential'),
+    ('main', 'showdown', 'showdown'),
+    ('mechanics', 'PokerDeck.deal', 'deal'),
+]
+
+
+class PhaseStats:
+    """Call count and total wall time for one phase."""
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def add(self, seconds):
+        self.calls += 1
+        self.seconds += seconds
+
+
+class Profiler:
+    """
+    Installs timing hooks on the hot paths. `sample_interval` (seconds)
+    additionally runs a SIGPROF sampling profiler that counts which of our
+    functions the interpreter was in at every tick (Unix only).
+    """
+    def __init__(self, sample_interval=None):
+        self.sample_interval = sample_interval
+        self.phases = defaultdict(PhaseStats)
+        self.bot_phases = defaultdict(lambda: defaultdict(PhaseStats))
+        self.samples = Counter()
+        self.current_bot = None
+        self._originals = []
+        self._previous_handler = None
+
+    # === INSTALLATION ===
+    def install(self):
+        if self._originals:
+            return self
+        for module_name, path, phase in HOOKS:
+            owner = importlib.import_module(module_name)
+            *parents, attribute = path.split('.')
+            for parent in parents:
+                owner = getattr(owner, parent)
+            original = getattr(owner, attribute)
+            if phase == 'decide':
+                wrapper = self._wrap_decide
+            elif inspect.isgeneratorfunction(original):
+                wrapper = self._wrap_steps
+            else:
+                wrapper = self._wrap
+            setattr(owner, attribute, wrapper(original, phase))
+            self._originals.append((owner, attribute, original))
+
+        if self.sample_interval:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(signal.ITIMER_PROF, self.sample_interval, self.sample_interval)
+        return self
+
+    def uninstall(self):
+        if self.sample_interval and self._originals:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def _wrap(self, func, phase):
+        stats = self.phases[phase]
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stats.add(elapsed)
+                if self.current_bot is not None:
+                    self.bot_phases[self.current_bot][phase].add(elapsed)
+        return timed
+
+    def _wrap_steps(self, func, phase):
+        # The engine's generators are timed from their first step until they finish
+        stats = self.phases[phase]
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return (yield from func(*args, **kwargs))
+            finally:
+                stats.add(perf_counter() - start)
+        return timed
+
+    def _wrap_decide(self, func, phase):
+        stats = self.phases[phase]
+
+        @functools.wraps(func)
+        def timed(bot, *args, **kwargs):
+            self.current_bot = bot.name
+            start = perf_counter()
+            try:
+                return func(bot, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stats.add(elapsed)
+                self.bot_phases[bot.name][phase].add(elapsed)
+                self.current_bot = None
+        return timed
+
+    def _sample(self, signum, frame):
+        # Charge the tick to the innermost frame in our own code, so time in
+        # numpy internals shows up under the function that called them
+        own = frame
+        while own is not None and (not own.f_code.co_filename.startswith(PACKAGE_DIR)
+                                   or own.f_code.co_name == 'timed'):
+            own = own.f_back
+        frame = own or frame
+        if frame is not None:
+            code = frame.f_code
+            self.samples[f"{os.path.basename(code.co_filename)}:{code.co_name}"] += 1
+
+    # === REPORTING ===
+    def summary(self):
+        """Returns the collected counters as plain dicts, with time per hand in ms."""
+        hands = self.phases['hand'].calls if 'hand' in self.phases else 0
+
+        def describe(stats):
+            return {'calls': stats.calls, 'seconds': stats.seconds,
+                    'ms_per_hand': 1000 * stats.seconds / hands if hands else 0.0,
+                    'ms_per_call': 1000 * stats.seconds / stats.calls if stats.calls else 0.0}
+
+        return {
+            'hands': hands,
+            'phases': {phase: describe(stats) for phase, stats in self.phases.items()},
+            'bots': {name: {phase: describe(stats) for phase, stats in phases.items()}
+                     for name, phases in self.bot_phases.items()},
+            'samples': dict(self.samples.most_common()),
+        }
+
+    def report(self, top=15):
+        """Formats the summary as text tables."""
+        summary = self.summary()
+        hand_seconds = summary['phases'].get('hand', {}).get('seconds', 0.0)
+
+        lines = [f"Hands: {summary['hands']}", "",
+                 f"{'Phase':<16}{'Calls':>9}{'Total ms':>11}{'ms/hand':>10}{'ms/call':>10}{'% hand':>8}"]
+        for phase, stats in summary['phases'].items():
+            share = 100 * stats['seconds'] / hand_seconds if hand_seconds else 0.0
+            lines.append(f"{phase:<16}{stats['calls']:>9}{1000 * stats['seconds']:>11.1f}"
+                         f"{stats['ms_per_hand']:>10.3f}{stats['ms_per_call']:>10.3f}{share:>7.1f}%")
+
+        lines += ["", f"{'Bot':<16}{'Phase':<14}{'Calls':>9}{'Total ms':>11}{'ms/hand':>10}{'ms/call':>10}"]
+        for name, phases in summary['bots'].items():
+            for phase, stats in phases.items():
+                lines.append(f"{name:<16}{phase:<14}{stats['calls']:>9}{1000 * stats['seconds']:>11.1f}"
+                             f"{stats['ms_per_hand']:>10.3f}{stats['ms_per_call']:>10.3f}")
+
+        if self.samples:
+            total = sum(self.samples.values())
+            lines += ["", f"{'Sampled function':<48}{'Samples':>9}{'%':>7}"]
+            for location, count in self.samples.most_common(top):
+                lines.append(f"{location:<48}{count:>9}{100 * count / total:>6.1f}%")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from events import NullSink
+    from main import run_texas_holdem
+
+    parser = argparse.ArgumentParser(description="Profile a headless game.")
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--sample', type=float, default=None, help="sampling interval in seconds (e.g. 0.001)")
+    args = parser.parse_args()
+
+    with Profiler(args.sample) as profiler:
+        run_texas_holdem(args.rounds, sink=NullSink())
+    print(profiler.report())
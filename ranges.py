@@ -0,0 +1,171 @@
+"""
+Weighted hand ranges and range-versus-range equity.
+
+A range gives every one of the 1326 two-card combos a weight: how likely the
+player is to hold it. Cards that are already known (the board, our own
+cards) remove the combos that use them. Equity is computed by enumeration
+when one opponent's range and the runouts are small enough, and otherwise by
+sampling every player's combo and the runout in one NumPy batch.
+"""
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from equity import EXACT_BUDGET, holding_shares, live_cards, score_hands
+from preflop import NUM_CLASSES, class_index, class_name, class_hand, preflop_equity
+
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.intp)
+NUM_COMBOS = len(COMBOS)
+
+# COMBO_INDEX[a, b] is the combo holding cards a and b
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.intp)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+# CARD_COMBOS[card] lists the 51 combos that use the card
+CARD_COMBOS = np.array([np.flatnonzero((COMBOS == card).any(axis=1)) for card in range(52)], dtype=np.intp)
+
+COMBO_CLASSES = np.array([class_index(combo) for combo in COMBOS.tolist()], dtype=np.intp)
+CLASS_INDEX = {class_name(index): index for index in range(NUM_CLASSES)}
+
+# Sampling redraws rows whose combos clash; give up if the ranges barely fit together
+MAX_REDRAWS = 100
+
+
+class HandRange:
+    """Weights over the 1326 two-card combos (not necessarily normalised)."""
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = np.ones(NUM_COMBOS)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (NUM_COMBOS,):
+            raise ValueError(f"A range needs one weight per combo ({NUM_COMBOS}).")
+
+    @classmethod
+    def uniform(cls):
+        """Every combo equally likely: a random hand."""
+        return cls()
+
+    @classmethod
+    def from_hand(cls, hand):
+        """A range holding exactly one combo."""
+        weights = np.zeros(NUM_COMBOS)
+        weights[COMBO_INDEX[hand[0], hand[1]]] = 1
+        return cls(weights)
+
+    @classmethod
+    def from_classes(cls, class_weights):
+        """Builds a range from starting-hand classes, e.g. {'AA': 1, 'AKs': 1, 'AQo': 0.5}."""
+        per_class = np.zeros(NUM_CLASSES)
+        for name, weight in class_weights.items():
+            per_class[CLASS_INDEX[name]] = weight
+        return cls(per_class[COMBO_CLASSES])
+
+    @classmethod
+    def top(cls, fraction, num_opponents=1):
+        """
+        The strongest `fraction` of all combos by pre-flop equity against
+        `num_opponents` random hands, e.g. top(0.15) for a raising range.
+        Whole classes are included until the fraction is reached.
+        """
+        strength = [preflop_equity(class_hand(index), num_opponents) for index in range(NUM_CLASSES)]
+        combos_per_class = np.bincount(COMBO_CLASSES, minlength=NUM_CLASSES)
+
+        per_class = np.zeros(NUM_CLASSES)
+        included = 0
+        for index in sorted(range(NUM_CLASSES), key=lambda index: -strength[index]):
+            if included >= fraction * NUM_COMBOS:
+                break
+            per_class[index] = 1
+            included += combos_per_class[index]
+        return cls(per_class[COMBO_CLASSES])
+
+    def live_weights(self, dead_cards):
+        """Returns the weights with every combo that uses a dead card removed."""
+        weights = self.weights.copy()
+        weights[CARD_COMBOS[list(dead_cards)]] = 0
+        return weights
+
+    def __len__(self):
+        """Number of combos with a non-zero weight."""
+        return int(np.count_nonzero(self.weights))
+
+
+def sample_combos(weights, count, rng):
+    """Draws `count` combo indices in proportion to `weights`."""
+    cumulative = np.cumsum(weights)
+    return np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side='right')
+
+
+def deal_ranges(live_weights, num_simulations, rng):
+    """
+    Draws one combo per player for every simulation so that no two players
+    share a card. Whole rows are redrawn on a clash, which samples exactly
+    from the joint distribution of the ranges. Returns (N, players, 2) cards.
+    """
+    players = len(live_weights)
+    picks = np.empty((num_simulations, players), dtype=np.intp)
+    pending = np.arange(num_simulations)
+
+    for _ in range(MAX_REDRAWS):
+        for player, weights in enumerate(live_weights):
+            picks[pending, player] = sample_combos(weights, len(pending), rng)
+        if players == 1:
+            return COMBOS[picks]
+
+        cards = np.sort(COMBOS[picks[pending]].reshape(len(pending), 2 * players), axis=1)
+        pending = pending[(np.diff(cards, axis=1) == 0).any(axis=1)]
+        if not len(pending):
+            return COMBOS[picks]
+
+    raise ValueError("The ranges overlap too much to deal them together.")
+
+
+def range_equity(hand, opponent_ranges, community_cards, num_simulations=1000, rng=None,
+                 exact_budget=EXACT_BUDGET):
+    """
+    Equity of `hand` (two cards or a HandRange) against one or more opponent
+    HandRanges, given the board so far. Ties share the pot. A fixed hand
+    against a single range is enumerated exactly when there are at most
+    `exact_budget` (combo, runout) pairs; everything else is sampled.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    missing_cards = 5 - len(community_cards)
+
+    our_range = hand if isinstance(hand, HandRange) else HandRange.from_hand(hand)
+    ranges = [our_range] + list(opponent_ranges)
+    live_weights = [player_range.live_weights(community_cards) for player_range in ranges]
+    if not all(weights.any() for weights in live_weights):
+        raise ValueError("A range has no combos left after removing the known cards.")
+
+    if not isinstance(hand, HandRange) and len(opponent_ranges) == 1:
+        opponent_weights = opponent_ranges[0].live_weights(hand + community_cards)
+        holdings = np.flatnonzero(opponent_weights)
+        if not len(holdings):
+            raise ValueError("The opponent range has no combos left after removing the known cards.")
+        runouts = comb(len(live_cards(hand + community_cards)), missing_cards)
+        if len(holdings) * runouts <= exact_budget:
+            shares, cols = holding_shares(hand, community_cards, COMBOS[holdings])
+            weights = opponent_weights[holdings][cols]
+            return float((shares * weights).sum() / weights.sum())
+
+    holes = deal_ranges(live_weights, num_simulations, rng)
+
+    # Deal the runout from what is left: the smallest random keys among live cards
+    board = np.empty((num_simulations, 5), dtype=np.intp)
+    board[:, :len(community_cards)] = community_cards
+    if missing_cards:
+        keys = rng.random((num_simulations, 52))
+        keys[:, community_cards] = 2
+        keys[np.arange(num_simulations)[:, None], holes.reshape(num_simulations, -1)] = 2
+        board[:, len(community_cards):] = np.argpartition(keys, missing_cards - 1, axis=1)[:, :missing_cards]
+
+    players = len(ranges)
+    seven_cards = np.concatenate([holes, np.broadcast_to(board[:, None, :], (num_simulations, players, 5))], axis=2)
+    scores = score_hands(seven_cards.reshape(-1, 7)).reshape(num_simulations, players)
+
+    # Lower rank is better; the pot is split between everyone tied for best
+    winners = scores == scores.min(axis=1, keepdims=True)
+    return float((winners[:, 0] / winners.sum(axis=1)).mean())
@@ -1,13 +1,49 @@
 import random
+from bisect import bisect
+import numpy as np
+import buckets
 from deck import PokerHandEvaluator
+from equity import (EXACT_BUDGET, EquityEstimate, confidence_interval, count_deals, spot_equities,
+                    spot_exact_equities, spot_sequential_equities)
+from events import ConsoleSink, EquityEstimated, PreflopStrength
+from equity_cache import shared_cache
+from equity_db import shared_db
+from hand_context import HandContext
+from logic import Action
 
 class BaseStrategy:
     """
     Base strategy class for poker bots, providing methods for hand evaluation
     and decision-making based on win probability.
     """
+    # Win-probability cut-offs that decide() compares against. Post-flop sampling
+    # stops as soon as the estimate is clearly on one side of all of them.
+    decision_thresholds = ()
+    confidence = 0.95
+
+    # Post-flop estimates are shared by every strategy in the process
+    equity_cache = shared_cache
+
+    # Read-only on-disk estimates, checked on a cache miss before simulating
+    equity_db = shared_db
+
+    # Where equity estimates are reported; the engine swaps in its own sink
+    sink = ConsoleSink()
+
+    # Heads-up simulations per flop spot when a batch has no thresholds to stop at
+    batch_simulations = 1000
+
+    # Commitment thresholds (invested fraction of stack, share of the pot) by bot type
+    commitment_thresholds = {
+        'aggressive': (0.40, 0.25),  # Aggressive bots commit a bit more
+        'conservative': (0.75, 0.55),  # Conservative bots require much larger investment
+        'random': (0.55, 0.40),  # Random behavior
+        'allin': (0.30, 0.20)  # All-in bots commit sooner
+    }
+
     def __init__(self):
         self.evaluator = PokerHandEvaluator()
+        self.last_estimate = None
 
     def evaluate_strength(self, hand, community_cards):
         """Evaluates hand strength if at least five cards are available."""
@@ -15,29 +51,162 @@ class BaseStrategy:
             return None
         return self.evaluator.evaluate_hand(hand, community_cards)
 
-    def estimate_win_probability(self, hand, community_cards, num_opponents=3):
+    def estimate_win_probability(self, hand, community_cards, num_opponents=3, context=None, deadline=None):
         """
         Estimates win probability using Monte Carlo simulation with an opponent scaling factor.
         The probability is adjusted based on the number of opponents.
+        `context` is the engine's HandContext for this hand, if there is one.
+        With a perf_counter() `deadline`, sampling stops when it passes and the
+        best estimate so far is used; its interval is in last_estimate.
         """
         if not community_cards:
+            # Heads-up equity, unadjusted, as the thresholds were set against
             strength = self.evaluator.preflop_hand_strength(hand)
-            print(f"🃏 Pre-flop: Hand {hand}, Strength: {strength:.2f}")
+            self.sink.emit(PreflopStrength(hand, strength))
             return strength
 
-        base_probability = self.evaluator.monte_carlo_simulation(hand, community_cards)
+        if context is None or context.hand != hand:
+            context = HandContext(hand, community_cards)
+        else:
+            context.sync(community_cards)
 
         # Increase penalty for more opponents
         adjustment_factor = max(0.05, 1 - (0.15 * (num_opponents - 1)))
+
+        if self.decision_thresholds:
+            # Thresholds apply to the adjusted probability, so undo the adjustment first
+            base_thresholds = [threshold / adjustment_factor for threshold in self.decision_thresholds]
+
+            # The simulation itself is always heads-up; only the thresholds depend on num_opponents
+            key = context.canonical_key(1)
+            self.last_estimate = self.equity_cache.lookup(key, base_thresholds)
+            if self.last_estimate is None:
+                self.last_estimate = self.equity_db.lookup(key, base_thresholds)
+                if self.last_estimate is None:
+                    self.last_estimate = self.evaluator.sequential_simulation(hand, community_cards, base_thresholds,
+                                                                              confidence=self.confidence,
+                                                                              context=context, deadline=deadline)
+                    self.equity_db.record(key, self.last_estimate)
+                self.equity_cache.store(key, self.last_estimate)
+            base_probability = self.last_estimate.equity
+        else:
+            self.last_estimate = self.equity_db.lookup(context.canonical_key(1))
+            if self.last_estimate is not None:
+                base_probability = self.last_estimate.equity
+            else:
+                base_probability = self.evaluator.monte_carlo_simulation(hand, community_cards, context=context)
+
         adjusted_probability = base_probability * adjustment_factor
 
         final_prob = max(0, min(1, adjusted_probability))
 
-        print(f"📊 Hand: {hand}, Community: {community_cards}, Base Prob: {base_probability:.2f}, "
-              f"Adj Factor: {adjustment_factor:.2f}, Final Prob: {final_prob:.2f}")
+        self.sink.emit(EquityEstimated(hand, list(community_cards), base_probability, adjustment_factor,
+                                       final_prob, self.last_estimate))
 
         return final_prob
 
+    def estimate_win_probabilities(self, game_states, num_opponents=None):
+        """
+        estimate_win_probability for a whole batch of game states, possibly
+        from many tables, returned as an array. Cached or stored estimates
+        are used as usual. The rest are worked out heads-up together, one
+        board size at a time: turn and river spots are enumerated exactly
+        and flop spots are sampled in rounds until each one's interval
+        clears its thresholds, as decide() does spot by spot.
+        `num_opponents` overrides the opponent count of every state. No
+        estimate events are emitted.
+        """
+        probabilities = np.empty(len(game_states))
+        adjustments = np.empty(len(game_states))
+        misses = {}  # board size -> [(index, key, context, base_thresholds)]
+
+        for index, game_state in enumerate(game_states):
+            hand = game_state.bot.hand
+            community_cards = game_state.community_cards
+            opponents = game_state.num_opponents if num_opponents is None else num_opponents
+            if not community_cards:
+                probabilities[index] = self.evaluator.preflop_hand_strength(hand)
+                adjustments[index] = 1
+                continue
+
+            context = game_state.bot.context
+            if context is None or context.hand != hand:
+                context = HandContext(hand, community_cards)
+            else:
+                context.sync(community_cards)
+
+            adjustments[index] = max(0.05, 1 - (0.15 * (opponents - 1)))
+            base_thresholds = [threshold / adjustments[index] for threshold in self.decision_thresholds]
+            key = context.canonical_key(1)
+            estimate = self.equity_cache.lookup(key, base_thresholds)
+            if estimate is None:
+                estimate = self.equity_db.lookup(key, base_thresholds)
+                if estimate is not None:
+                    self.equity_cache.store(key, estimate)
+            if estimate is None:
+                misses.setdefault(len(community_cards), []).append((index, key, context, base_thresholds))
+            else:
+                probabilities[index] = estimate.equity
+
+        for board_size, spots in misses.items():
+            hands = [context.hand for _, _, context, _ in spots]
+            boards = [context.board for _, _, context, _ in spots]
+            num_deals = count_deals(hands[0] + boards[0], 5 - board_size, 1)
+            if num_deals <= EXACT_BUDGET:
+                estimates = [EquityEstimate(equity, equity, equity, num_deals, True)
+                             for equity in spot_exact_equities(hands, boards).tolist()]
+            elif self.decision_thresholds:
+                thresholds = [base_thresholds for _, _, _, base_thresholds in spots]
+                results = spot_sequential_equities(hands, boards, thresholds, self.confidence, rng=self.evaluator.rng)
+                estimates = [EquityEstimate(equity, low, high, samples, False)
+                             for equity, low, high, samples in zip(*(result.tolist() for result in results))]
+            else:
+                equities = spot_equities(hands, boards, self.batch_simulations, self.evaluator.rng)
+                estimates = []
+                for equity in equities.tolist():
+                    low, high = confidence_interval(equity, self.batch_simulations, self.confidence)
+                    estimates.append(EquityEstimate(equity, low, high, self.batch_simulations, False))
+
+            for (index, key, _, _), estimate in zip(spots, estimates):
+                self.equity_db.record(key, estimate)
+                self.equity_cache.store(key, estimate)
+                probabilities[index] = estimate.equity
+
+        return np.clip(probabilities * adjustments, 0, 1)
+
+    def pot_committed_batch(self, game_states, bot_type):
+        """is_pot_committed for every game state's bot at once, as a boolean array."""
+        stack_threshold, pot_threshold = self.commitment_thresholds.get(bot_type, (0.60, 0.40))
+        current_bets = np.array([game_state.bot.current_bet for game_state in game_states], dtype=float)
+        stacks = np.array([game_state.bot.stack for game_state in game_states], dtype=float)
+        pots = np.array([game_state.pot for game_state in game_states], dtype=float)
+
+        invested_fraction = current_bets / np.maximum(stacks + current_bets, 1)
+        pot_share = current_bets / np.maximum(pots, 1)
+        return (invested_fraction > stack_threshold) | (pot_share > pot_threshold)
+
+    def decide_batch(self, game_states):
+        """
+        Decides for many game states at once, e.g. the pending decisions of
+        many tables. The bots may differ but should all play this strategy
+        class; this instance's evaluator, cache and sink are used for all of
+        them. Returns the decisions in order. Strategies with a vectorized
+        rule override this; the default asks decide() for each state.
+        """
+        return [self.decide(game_state, game_state.bot.hand) for game_state in game_states]
+
+    @staticmethod
+    def batch_decisions(actions, amounts):
+        """Pairs arrays of Action codes and amounts into (Action, amount) decisions."""
+        return [(Action(action), amount) for action, amount in zip(actions.tolist(), amounts.tolist())]
+
+    def bucket(self, hand, community_cards, context=None):
+        """
+        Heads-up strength bucket of the hand (0 to buckets.NUM_BUCKETS - 1):
+        a table lookup pre-flop and on the flop, cached exact equity later.
+        """
+        return buckets.bucket(hand, community_cards, context)
+
     def should_bluff(self):
         """
         Determines if the bot should bluff based on a random probability.
@@ -50,14 +219,7 @@ class BaseStrategy:
         Checks if the bot is pot-committed based on its current bet relative to its stack and the total pot.
         Different bot types have different commitment thresholds.
         """
-        commitment_thresholds = {
-            'aggressive': (0.40, 0.25),  # Aggressive bots commit a bit more
-            'conservative': (0.75, 0.55),  # Conservative bots require much larger investment
-            'random': (0.55, 0.40),  # Random behavior
-            'allin': (0.30, 0.20)  # All-in bots commit sooner
-        }
-
-        stack_threshold, pot_threshold = commitment_thresholds.get(bot_type, (0.60, 0.40))
+        stack_threshold, pot_threshold = self.commitment_thresholds.get(bot_type, (0.60, 0.40))
         invested_fraction = bot.current_bet / max(bot.stack + bot.current_bet, 1)
         pot_share = bot.current_bet / max(pot, 1)
 
@@ -65,37 +227,59 @@ class BaseStrategy:
 
 
 class AggressiveStrategy(BaseStrategy):
+    decision_thresholds = (0.4, 0.6)
+
     def decide(self, game_state, hand):
-        num_opponents = game_state.get('num_opponents', 1)
-        win_probability = self.estimate_win_probability(hand, game_state['community_cards'], num_opponents)
-        pot = game_state.get('pot', 1)
-        is_committed = self.is_pot_committed(game_state['bot'], pot, 'aggressive')
+        win_probability = self.estimate_win_probability(hand, game_state.community_cards, game_state.num_opponents,
+                                                       game_state.bot.context, game_state.deadline)
+        is_committed = self.is_pot_committed(game_state.bot, game_state.pot, 'aggressive')
 
         if win_probability < 0.4 and not is_committed:
-            return ('fold', 0)  # Now folds more often
+            return (Action.FOLD, 0)  # Now folds more often
 
         if win_probability > 0.6:
-            return ('raise', int(win_probability * 140))
+            return (Action.RAISE, int(win_probability * 140))
+
+        return (Action.CALL, 10)
+
+    def decide_batch(self, game_states):
+        win_probability = self.estimate_win_probabilities(game_states)
+        is_committed = self.pot_committed_batch(game_states, 'aggressive')
 
-        return ('call', 10)
+        fold = (win_probability < 0.4) & ~is_committed
+        raise_ = ~fold & (win_probability > 0.6)
+        actions = np.select([fold, raise_], [Action.FOLD, Action.RAISE], Action.CALL)
+        amounts = np.select([fold, raise_], [0, (win_probability * 140).astype(int)], 10)
+        return self.batch_decisions(actions, amounts)
 
 
 class ConservativeStrategy(BaseStrategy):
+    decision_thresholds = (0.3, 0.65, 0.7)
+
     def decide(self, game_state, hand):
-        win_probability = float(self.estimate_win_probability(hand, game_state['community_cards']))
-        pot = game_state.get('pot', 1)
-        is_committed = self.is_pot_committed(game_state['bot'], pot, 'conservative')
+        win_probability = float(self.estimate_win_probability(hand, game_state.community_cards,
+                                                             context=game_state.bot.context,
+                                                             deadline=game_state.deadline))
+        is_committed = self.is_pot_committed(game_state.bot, game_state.pot, 'conservative')
 
         if win_probability < 0.65 and not is_committed:
-            return ('fold', 0)  # Conservative bots fold even more
+            return (Action.FOLD, 0)  # Conservative bots fold even more
 
         if is_committed and win_probability < 0.3:
-            return ('fold', 0)  # If they are pot-committed but still weak, fold
+            return (Action.FOLD, 0)  # If they are pot-committed but still weak, fold
 
         if win_probability > 0.7:
-            return ('raise', 20)
+            return (Action.RAISE, 20)
+
+        return Action.FOLD
+
+    def decide_batch(self, game_states):
+        win_probability = self.estimate_win_probabilities(game_states, num_opponents=3)
 
-        return 'fold'
+        # As in decide(), only hands above 0.7 play, whether committed or not
+        raise_ = win_probability > 0.7
+        actions = np.where(raise_, Action.RAISE, Action.FOLD)
+        return self.batch_decisions(actions, np.where(raise_, 20, 0))
 
 
 class RandomStrategy(BaseStrategy):
@@ -103,22 +287,60 @@ class RandomStrategy(BaseStrategy):
     Strategy for unpredictable players who make random decisions.
     This adds an element of surprise to the game, making it harder to predict their moves.
     """
+    actions = (Action.FOLD, Action.CALL, Action.RAISE)
+    cumulative_weights = (0.5, 0.8, 1.0)
+
     def decide(self, game_state, hand):
-        return random.choices(['fold', 'call', 'raise'], weights=[0.5, 0.3, 0.2])[0]
+        # Same draw as random.choices(actions, weights=[0.5, 0.3, 0.2]) without building lists
+        return self.actions[bisect(self.cumulative_weights, random.random())]
 
 
 class AllIn(BaseStrategy):
+    decision_thresholds = (0.8,)
+
     def decide(self, game_state, hand):
-        win_probability = self.estimate_win_probability(hand, game_state['community_cards'])
+        win_probability = self.estimate_win_probability(hand, game_state.community_cards,
+                                                        context=game_state.bot.context, deadline=game_state.deadline)
 
         if win_probability < 0.8:
-            return ('fold', 0)  # No more going all-in on weak hands
+            return (Action.FOLD, 0)  # No more going all-in on weak hands
 
         if win_probability >= 0.8:
-            return ('allin', game_state['bot'].stack)
+            return (Action.ALLIN, game_state.bot.stack)
+
+        return (Action.CALL, 10)
+
+    def decide_batch(self, game_states):
+        win_probability = self.estimate_win_probabilities(game_states, num_opponents=3)
+        stacks = np.array([game_state.bot.stack for game_state in game_states])
+
+        all_in = win_probability >= 0.8
+        return self.batch_decisions(np.where(all_in, Action.ALLIN, Action.FOLD), np.where(all_in, stacks, 0))
+
+
+class BucketStrategy(BaseStrategy):
+    """
+    Decides from the strength bucket alone, so a decision is a table lookup
+    rather than a simulation. Buckets measure heads-up strength, so both
+    bars go up a bucket for every extra opponent.
+    """
+    fold_below = 8  # EHS under 0.40
+    raise_from = 13  # EHS 0.65 and up
+
+    def decide(self, game_state, hand):
+        strength_bucket = self.bucket(hand, game_state.community_cards, game_state.bot.context)
+        extra_opponents = max(game_state.num_opponents - 1, 0)
+        is_committed = self.is_pot_committed(game_state.bot, game_state.pot, 'bucket')
+
+        if strength_bucket < self.fold_below + extra_opponents and not is_committed:
+            return (Action.FOLD, 0)
+
+        if strength_bucket >= self.raise_from + extra_opponents:
+            return (Action.RAISE, 20)
+
+        return (Action.CALL, 10)
 
-        return ('call', 10)
 
 class fold(BaseStrategy):
     def decide(self, game_state, hand):
-        return ('fold', 0)
+        return (Action.FOLD, 0)
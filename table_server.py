@@ -0,0 +1,414 @@
+"""
+Many tables at once in one asyncio event loop.
+
+Every table is a task that steps main.run_texas_holdem_steps and awaits each
+decision it yields, so one slow decision never holds up the other tables:
+
+* local bots decide on an executor (a thread pool by default, or a process
+  pool, or inline on the loop with no executor at all), or in batches: the
+  decisions pending across all tables are gathered each time round the
+  loop and handed to each strategy class's decide_batch in one call;
+* remote bots are clients connected over a local TCP socket.
+
+The socket protocol is one JSON object per line. A client opens with
+{"type": "hello", "name": ...}. For every decision the server sends
+{"type": "decide", "id": ..., "hand": [...], "community_cards": [...],
+"stage": ..., "pot": ..., "minimum_bet": ..., "money_committed": ...,
+"num_opponents": ..., "stack": ..., "deadline_ms": ...} and the client
+answers {"id": ..., "action": "fold" | "check" | "call" | "raise" | "allin",
+"amount": ...}. A missing, late or unreadable answer folds. One client may
+play seats at any number of tables; answers are matched up by id.
+
+run_client() is a stand-in client that plays a built-in strategy.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from events import CountingSink, NullSink
+from logic import Action, GameState, PokerBot
+from main import create_bots, run_texas_holdem_steps
+from strategies import ConservativeStrategy
+
+HOST = '127.0.0.1'
+
+# Answer time allowed to a remote bot when the tables run without a decision_time
+REMOTE_TIMEOUT = 5.0
+
+ACTIONS = {action.name.lower(): action for action in Action}
+
+
+class RemoteConnection:
+    """
+    The server's end of one connected client. Requests are sent with an id
+    and their futures are resolved by a reader task as the answers arrive.
+    """
+    def __init__(self, name, reader, writer):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.timeouts = 0
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        try:
+            while line := await self.reader.readline():
+                try:
+                    reply = json.loads(line)
+                    future = self.waiting.pop(reply['id'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # Unreadable or stale answers are dropped
+                if not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_result(None)  # The client has gone
+
+    async def request(self, message, timeout):
+        """Sends a decide request and returns the answer, or None when none arrives in time."""
+        self.next_id += 1
+        message['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        try:
+            self.writer.write(json.dumps(message).encode() + b'\n')
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.timeouts += 1
+            return None
+        finally:
+            self.waiting.pop(message['id'], None)
+
+    def close(self):
+        self.listener.cancel()
+        self.writer.close()
+
+
+class RemoteStrategy:
+    """Seat strategy for a bot whose decisions come from a connected client."""
+    def __init__(self, connection):
+        self.connection = connection
+        self.sink = None  # Set by the engine like any other strategy's
+
+    async def decide_async(self, game_state, hand):
+        """Asks the client and returns its Action, folding on no valid answer."""
+        bot = game_state.bot
+        if game_state.deadline is not None:
+            timeout = max(game_state.deadline - perf_counter(), 0)
+        else:
+            timeout = REMOTE_TIMEOUT
+        reply = await self.connection.request({
+            'type': 'decide',
+            'hand': hand,
+            'community_cards': list(game_state.community_cards),
+            'stage': game_state.stage,
+            'pot': game_state.pot,
+            'minimum_bet': game_state.minimum_bet,
+            'money_committed': game_state.money_committed,
+            'num_opponents': game_state.num_opponents,
+            'stack': bot.stack,
+            'deadline_ms': None if game_state.deadline is None else round(1000 * timeout, 3),
+        }, timeout)
+        if not isinstance(reply, dict):
+            return Action.FOLD
+        return ACTIONS.get(reply.get('action'), Action.FOLD)
+
+
+class LatencyLog:
+    """Decision latencies in seconds, grouped by where the decision was made."""
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, kind, seconds):
+        self.samples.setdefault(kind, []).append(seconds)
+
+    def summary(self):
+        """Returns {kind: {'count', 'p50', 'p90', 'p99', 'max'}} with times in milliseconds."""
+        summary = {}
+        for kind, samples in self.samples.items():
+            milliseconds = 1000 * np.array(samples)
+            p50, p90, p99 = np.percentile(milliseconds, [50, 90, 99])
+            summary[kind] = {'count': len(samples), 'p50': float(p50), 'p90': float(p90), 'p99': float(p99),
+                             'max': float(milliseconds.max())}
+        return summary
+
+
+def decide_in_process(game_state, seed):
+    """
+    Decides on the pickled copy of a bot that a process pool receives. The
+    copy's generator would start from the same state for every decision,
+    so it is replaced by one from `seed`. The hand context and estimate the
+    decision updated are returned along with it for the real bot.
+    """
+    bot = game_state.bot
+    bot.strategy.evaluator.rng = np.random.default_rng(seed)
+    decision = bot.decide_action(game_state, game_state.minimum_bet, game_state.deadline)
+    return decision, bot.context, bot.strategy.last_estimate
+
+
+class AsyncTableManager:
+    """
+    Plays many tables concurrently. `executor` runs the local bots' decisions
+    (None decides inline on the event loop); with `batch` set they are
+    instead gathered and made with decide_batch, which does not use
+    deadlines. `decision_time` is the per-decision budget in seconds, which
+    also bounds how long a remote bot is waited for.
+    """
+    def __init__(self, executor=None, decision_time=None, batch=False):
+        self.executor = executor
+        self.decision_time = decision_time
+        # Decisions made in other processes each get a generator spawned from this
+        self.seed_sequence = np.random.SeedSequence()
+        self.batch = batch
+        self.pending = []
+        self.batch_sizes = []
+        self.latency = LatencyLog()
+        self.clients = []
+        self.client_joined = asyncio.Event()
+        self.server = None
+        self.hands = 0
+
+    # === REMOTE CLIENTS ===
+    async def start_server(self, host=HOST, port=0):
+        """Listens for remote bots and returns the port."""
+        self.server = await asyncio.start_server(self._accept, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _accept(self, reader, writer):
+        try:
+            hello = json.loads(await reader.readline())
+            name = str(hello['name'])
+        except (ValueError, KeyError, TypeError):
+            writer.close()
+            return
+        self.clients.append(RemoteConnection(name, reader, writer))
+        self.client_joined.set()
+
+    async def wait_for_clients(self, count):
+        while len(self.clients) < count:
+            self.client_joined.clear()
+            await self.client_joined.wait()
+
+    async def close(self):
+        for connection in self.clients:
+            connection.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # === TABLES ===
+    async def decide(self, game_state):
+        """Awaits one decision, wherever it is made, and logs its latency."""
+        bot = game_state.bot
+        start = perf_counter()
+        if isinstance(bot.strategy, RemoteStrategy):
+            action = await bot.strategy.decide_async(game_state, bot.hand)
+            decision = bot.table_action(action, game_state.minimum_bet)
+            kind = 'remote'
+        elif self.batch:
+            future = asyncio.get_running_loop().create_future()
+            self.pending.append((game_state, future))
+            if len(self.pending) == 1:
+                asyncio.get_running_loop().call_soon(self.decide_pending)
+            decision = await future
+            kind = 'batch'
+        elif self.executor is None:
+            decision = bot.decide_action(game_state, game_state.minimum_bet, game_state.deadline)
+            kind = 'inline'
+        elif isinstance(self.executor, ProcessPoolExecutor):
+            decision, bot.context, bot.strategy.last_estimate = await asyncio.get_running_loop().run_in_executor(
+                self.executor, decide_in_process, game_state, self.seed_sequence.spawn(1)[0])
+            kind = 'local'
+        else:
+            decision = await asyncio.get_running_loop().run_in_executor(
+                self.executor, bot.decide_action, game_state, game_state.minimum_bet, game_state.deadline)
+            kind = 'local'
+        self.latency.add(kind, perf_counter() - start)
+        return decision
+
+    def decide_pending(self):
+        """
+        Makes every pending local decision, one decide_batch call per strategy
+        class. Runs once the tables that could move this time round the loop
+        have all asked for their decisions. It runs as a bare loop callback,
+        so if a decision fails the error is passed to every table still
+        waiting rather than left in the loop's log.
+        """
+        pending, self.pending = self.pending, []
+        self.batch_sizes.append(len(pending))
+        groups = {}
+        for game_state, future in pending:
+            groups.setdefault(type(game_state.bot.strategy), []).append((game_state, future))
+
+        try:
+            for group in groups.values():
+                game_states = [game_state for game_state, _ in group]
+                decisions = game_states[0].bot.strategy.decide_batch(game_states)
+                for (game_state, future), decision in zip(group, decisions):
+                    future.set_result(game_state.bot.table_action(decision, game_state.minimum_bet))
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def play_table(self, bots, rounds):
+        """Plays one table of `bots` for up to `rounds` hands."""
+        sink = CountingSink()
+        steps = run_texas_holdem_steps(rounds, sink, bots, decision_time=self.decision_time)
+        try:
+            game_state = next(steps)
+            while True:
+                decision = await self.decide(game_state)
+                if self.executor is None and not self.batch and \
+                        not isinstance(game_state.bot.strategy, RemoteStrategy):
+                    await asyncio.sleep(0)  # Let the other tables move between inline decisions
+                game_state = steps.send(decision)
+        except StopIteration:
+            pass
+        self.hands += sink.counts['RoundStarted']
+
+    async def run(self, tables, rounds=50, remote_seats=0):
+        """
+        Plays `tables` tables of the standard bots, the last `remote_seats`
+        seats at each table going to connected clients in turn, and returns a
+        report with throughput and decision latency percentiles.
+        """
+        if remote_seats:
+            await self.wait_for_clients(1)
+
+        lineups = []
+        for table in range(tables):
+            bots = create_bots()
+            for seat in range(len(bots) - remote_seats, len(bots)):
+                connection = self.clients[(table * remote_seats + seat) % len(self.clients)]
+                bots[seat] = PokerBot(f"{connection.name}-{table}.{seat}", RemoteStrategy(connection),
+                                      stack=bots[seat].stack)
+            lineups.append(bots)
+
+        start = perf_counter()
+        await asyncio.gather(*(self.play_table(bots, rounds) for bots in lineups))
+        seconds = perf_counter() - start
+
+        latency = self.latency.summary()
+        return {
+            'tables': tables,
+            'hands': self.hands,
+            'decisions': sum(kind['count'] for kind in latency.values()),
+            'remote_timeouts': sum(connection.timeouts for connection in self.clients),
+            'mean_batch': float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+            'seconds': seconds,
+            'tables_per_second': tables / seconds,
+            'hands_per_second': self.hands / seconds,
+            'latency_ms': latency,
+        }
+
+
+# === STAND-IN CLIENT ===
+async def run_client(port, name='remote', strategy=None, host=HOST):
+    """
+    A remote bot that connects to the table manager and answers every request
+    with a built-in strategy (ConservativeStrategy by default) until the
+    server closes the connection.
+    """
+    strategy = strategy if strategy is not None else ConservativeStrategy()
+    strategy.sink = NullSink()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({'type': 'hello', 'name': name}).encode() + b'\n')
+    await writer.drain()
+
+    bot = PokerBot(name, strategy)
+    game_state = GameState()
+    game_state.bot = bot
+    try:
+        while line := await reader.readline():
+            request = json.loads(line)
+            bot.hand = request['hand']
+            bot.stack = request['stack']
+            bot.current_bet = request['money_committed']
+            game_state.community_cards = request['community_cards']
+            game_state.stage = request['stage']
+            game_state.pot = request['pot']
+            game_state.minimum_bet = request['minimum_bet']
+            game_state.money_committed = request['money_committed']
+            game_state.num_opponents = request['num_opponents']
+            if request['deadline_ms'] is not None:
+                game_state.deadline = perf_counter() + request['deadline_ms'] / 1000
+            else:
+                game_state.deadline = None
+
+            action = strategy.decide(game_state, bot.hand)
+            if action.__class__ is tuple:
+                action, amount = action
+            else:
+                amount = 0
+            writer.write(json.dumps({'id': request['id'], 'action': action.name.lower(),
+                                     'amount': amount}).encode() + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def format_report(report):
+    """Formats a run() report as text."""
+    lines = [
+        f"Tables: {report['tables']}  Hands: {report['hands']}  Decisions: {report['decisions']}"
+        f"  in {report['seconds']:.2f}s  Remote timeouts: {report['remote_timeouts']}",
+        f"{report['tables_per_second']:.1f} tables/s, {report['hands_per_second']:.0f} hands/s"
+        + (f", {report['mean_batch']:.1f} decisions per batch" if report['mean_batch'] else ""),
+        f"{'Decisions':<10}{'Count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for kind, stats in sorted(report['latency_ms'].items()):
+        lines.append(f"{kind:<10}{stats['count']:>8}{stats['p50']:>10.3f}{stats['p90']:>10.3f}"
+                     f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+    return "\n".join(lines)
+
+
+async def main(tables, rounds, remote_seats, clients, executor, decision_time, batch=False):
+    manager = AsyncTableManager(executor, decision_time, batch)
+    client_tasks = []
+    if remote_seats:
+        port = await manager.start_server()
+        client_tasks = [asyncio.create_task(run_client(port, f"client{index}")) for index in range(clients)]
+        await manager.wait_for_clients(clients)
+    try:
+        return await manager.run(tables, rounds, remote_seats)
+    finally:
+        await manager.close()
+        await asyncio.gather(*client_tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many tables at once in one event loop.")
+    parser.add_argument('--tables', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=20, help="hands per table")
+    parser.add_argument('--remote', type=int, default=0, help="seats per table played by socket clients")
+    parser.add_argument('--clients', type=int, default=1, help="stand-in clients to connect")
+    parser.add_argument('--executor', choices=['inline', 'thread', 'process', 'batch'], default='thread',
+                        help="where local bots decide")
+    parser.add_argument('--workers', type=int, default=None, help="executor workers")
+    parser.add_argument('--decision-time', type=float, default=None, help="seconds per decision")
+    args = parser.parse_args()
+
+    if args.executor == 'thread':
+        pool = ThreadPoolExecutor(args.workers)
+    elif args.executor == 'process':
+        pool = ProcessPoolExecutor(args.workers)
+    else:
+        pool = None
+
+    try:
+        print(format_report(asyncio.run(main(args.tables, args.rounds, args.remote, args.clients, pool,
+                                             args.decision_time, args.executor == 'batch'))))
+    finally:
+        if pool is not None:
+            pool.shutdown()
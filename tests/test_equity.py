@@ -0,0 +1,50 @@
+"""Tests for the many-spot equity functions."""
+import random
+
+import numpy as np
+import pytest
+
+from equity import batch_equity, spot_exact_equities, spot_sequential_equities
+
+
+def random_spots(count, board_size, seed):
+    rng = random.Random(seed)
+    hands, boards = [], []
+    for _ in range(count):
+        cards = rng.sample(range(52), 2 + board_size)
+        hands.append(cards[:2])
+        boards.append(cards[2:])
+    return hands, boards
+
+
+@pytest.mark.parametrize('board_size', [4, 5])
+def test_spot_exact_equities_match_batch_equity(board_size):
+    hands, boards = random_spots(30, board_size, seed=board_size)
+    # Suited boards, so that many opponent holdings make flushes
+    hands.append([0, 4])
+    boards.append([1, 5, 9, 13, 21][:board_size])
+
+    expected = [batch_equity(hand, board, 1) for hand, board in zip(hands, boards)]
+    assert spot_exact_equities(hands, boards, chunk_deals=100000) == pytest.approx(expected, abs=1e-12)
+
+
+def test_spot_sequential_equities_stop_once_clear():
+    hands, boards = random_spots(40, 3, seed=1)
+    thresholds = [[0.4, 0.6]] * len(hands)
+
+    equities, lows, highs, samples = spot_sequential_equities(hands, boards, thresholds, batch_size=250,
+                                                              max_simulations=2000, rng=np.random.default_rng(0))
+
+    assert ((samples >= 250) & (samples <= 2000) & (samples % 250 == 0)).all()
+    assert ((lows <= equities) & (equities <= highs)).all()
+    straddling = ((lows < 0.4) & (0.4 < highs)) | ((lows < 0.6) & (0.6 < highs))
+    # Only spots that ran out of samples may still straddle a threshold
+    assert (samples[straddling] == 2000).all()
+    assert (samples == 250).any()
+
+
+def test_spot_sequential_equities_without_simulations():
+    hands, boards = random_spots(3, 3, seed=2)
+    equities, lows, highs, samples = spot_sequential_equities(hands, boards, [[0.5]] * 3, max_simulations=0)
+    assert equities.tolist() == [0.5] * 3
+    assert samples.tolist() == [0] * 3
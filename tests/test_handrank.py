@@ -0,0 +1,48 @@
+"""Cross-checks the lookup-table hand evaluator against Treys."""
+import random
+from itertools import combinations
+
+import pytest
+
+treys = pytest.importorskip("treys")
+
+import handrank
+
+NUM_RANDOM_HANDS = 20000
+
+TREYS_CARDS = [treys.Card.new("23456789TJQKA"[card >> 2] + "hdcs"[card & 3]) for card in range(52)]
+
+
+@pytest.fixture(scope="module")
+def treys_rank():
+    evaluator = treys.Evaluator()
+    return lambda hand: evaluator.evaluate([], [TREYS_CARDS[card] for card in hand])
+
+
+@pytest.fixture(scope="module")
+def random_hands():
+    rng = random.Random(0)
+    return [rng.sample(range(52), rng.choice((6, 7))) for _ in range(NUM_RANDOM_HANDS)]
+
+
+def test_every_five_card_hand_matches_treys(treys_rank):
+    for hand in combinations(range(52), 5):
+        assert handrank.evaluate(hand) == treys_rank(hand), hand
+
+
+def test_six_and_seven_card_hands_match_treys(treys_rank, random_hands):
+    for hand in random_hands:
+        assert handrank.evaluate(hand) == treys_rank(hand), hand
+
+
+def test_best_five_reproduces_the_rank(random_hands):
+    for hand in random_hands:
+        five = handrank.best_five(hand)
+        assert len(five) == 5 and set(five) <= set(hand), (hand, five)
+        assert handrank.evaluate(five) == handrank.evaluate(hand), (hand, five)
+
+
+def test_evaluate_batch_matches_evaluate(treys_rank, random_hands):
+    seven_card_hands = [hand for hand in random_hands if len(hand) == 7]
+    ranks = handrank.evaluate_batch(seven_card_hands)
+    assert ranks.tolist() == [treys_rank(hand) for hand in seven_card_hands]
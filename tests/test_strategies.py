@@ -0,0 +1,139 @@
+"""Tests for the batched strategy API against the per-spot one."""
+import random
+
+import numpy as np
+import pytest
+
+from equity import batch_equity
+from equity_cache import EquityCache
+from equity_db import EquityDB
+from events import NullSink
+from hand_context import HandContext
+from logic import GameState, PokerBot
+from preflop import preflop_equity
+from strategies import AggressiveStrategy, AllIn, BaseStrategy, ConservativeStrategy
+
+STRATEGIES = (AggressiveStrategy, ConservativeStrategy, AllIn)
+
+
+@pytest.fixture(autouse=True)
+def fresh_estimates(monkeypatch, tmp_path):
+    """Every test starts from an empty cache and an empty equity database."""
+    monkeypatch.setattr(BaseStrategy, 'equity_cache', EquityCache())
+    monkeypatch.setattr(BaseStrategy, 'equity_db', EquityDB(str(tmp_path / 'equity_db.bin')))
+
+
+def make_strategy(strategy_class, seed=0):
+    strategy = strategy_class()
+    strategy.sink = NullSink()
+    strategy.evaluator.rng = np.random.default_rng(seed)
+    return strategy
+
+
+def make_state(strategy, hand, board, num_opponents=3):
+    game_state = GameState(list(board))
+    game_state.bot = PokerBot("TestBot", strategy, stack=2000)
+    game_state.bot.hand = list(hand)
+    game_state.pot = 100
+    game_state.minimum_bet = 10
+    game_state.num_opponents = num_opponents
+    return game_state
+
+
+def random_spots(count, board_size, seed):
+    rng = random.Random(seed)
+    spots = []
+    for _ in range(count):
+        cards = rng.sample(range(52), 2 + board_size)
+        spots.append((cards[:2], cards[2:]))
+    return spots
+
+
+def test_exact_spots_match_estimate_win_probability():
+    spots = random_spots(10, 4, seed=1) + random_spots(10, 5, seed=2)
+    strategy = make_strategy(AggressiveStrategy)
+    game_states = [make_state(strategy, hand, board, num_opponents=1 + index % 3)
+                   for index, (hand, board) in enumerate(spots)]
+
+    batched = strategy.estimate_win_probabilities(game_states)
+
+    BaseStrategy.equity_cache.clear()
+    single = [strategy.estimate_win_probability(game_state.bot.hand, game_state.community_cards,
+                                                game_state.num_opponents) for game_state in game_states]
+    assert batched == pytest.approx(single, abs=1e-12)
+    assert all(estimate.exact for estimate in BaseStrategy.equity_cache.entries.values())
+
+
+def test_preflop_spots_use_unadjusted_heads_up_equity():
+    strategy = make_strategy(ConservativeStrategy)
+    spots = random_spots(10, 0, seed=3)
+    game_states = [make_state(strategy, hand, board, num_opponents=3) for hand, board in spots]
+
+    probabilities = strategy.estimate_win_probabilities(game_states)
+
+    assert probabilities.tolist() == [preflop_equity(hand, 1) for hand, _ in spots]
+    assert len(BaseStrategy.equity_cache.entries) == 0
+
+
+def test_num_opponents_overrides_every_state():
+    strategy = make_strategy(AggressiveStrategy)
+    spots = random_spots(6, 5, seed=4)
+    game_states = [make_state(strategy, hand, board, num_opponents=1) for hand, board in spots]
+
+    heads_up = strategy.estimate_win_probabilities(game_states)
+    overridden = strategy.estimate_win_probabilities(game_states, num_opponents=3)
+
+    equities = [batch_equity(hand, board, 1) for hand, board in spots]
+    assert heads_up == pytest.approx(equities, abs=1e-12)
+    assert overridden == pytest.approx([0.7 * equity for equity in equities], abs=1e-12)
+
+
+def test_mixed_board_sizes_in_one_call():
+    strategy = make_strategy(AggressiveStrategy)
+    spots = [spot for board_size in (0, 3, 4, 5) for spot in random_spots(5, board_size, seed=10 + board_size)]
+    random.Random(5).shuffle(spots)
+    game_states = [make_state(strategy, hand, board, num_opponents=1) for hand, board in spots]
+
+    probabilities = strategy.estimate_win_probabilities(game_states)
+
+    for (hand, board), probability in zip(spots, probabilities):
+        if not board:
+            assert probability == preflop_equity(hand, 1)
+        elif len(board) == 3:
+            # Sampled until clear of the thresholds, so only close
+            assert probability == pytest.approx(batch_equity(hand, board, 1, 20000), abs=0.1)
+        else:
+            assert probability == pytest.approx(batch_equity(hand, board, 1), abs=1e-12)
+
+
+def straddles(estimate, thresholds):
+    return any(estimate.low < threshold < estimate.high for threshold in thresholds)
+
+
+@pytest.mark.parametrize('strategy_class', STRATEGIES)
+def test_decide_batch_matches_decide(strategy_class):
+    spots = [spot for board_size in (0, 3, 4, 5) for spot in random_spots(15, board_size, seed=20 + board_size)]
+
+    single_strategy = make_strategy(strategy_class, seed=0)
+    single = []
+    single_estimates = []
+    for hand, board in spots:
+        game_state = make_state(single_strategy, hand, board)
+        single.append(game_state.bot.table_action(single_strategy.decide(game_state, game_state.bot.hand),
+                                                  game_state.minimum_bet))
+        single_estimates.append(single_strategy.last_estimate if board else None)
+
+    BaseStrategy.equity_cache.clear()
+    batch_strategy = make_strategy(strategy_class, seed=0)
+    game_states = [make_state(batch_strategy, hand, board) for hand, board in spots]
+    batched = [game_state.bot.table_action(decision, game_state.minimum_bet)
+               for game_state, decision in zip(game_states, batch_strategy.decide_batch(game_states))]
+
+    # Conservative and AllIn judge every spot as if against three opponents, as decide() does
+    thresholds = [threshold / 0.7 for threshold in strategy_class.decision_thresholds]
+    for (hand, board), single_action, batch_action, estimate in zip(spots, single, batched, single_estimates):
+        if len(board) == 3:
+            batch_estimate = BaseStrategy.equity_cache.entries.get(HandContext(hand, board).canonical_key(1))
+            if straddles(estimate, thresholds) or batch_estimate is None or straddles(batch_estimate, thresholds):
+                continue  # Too close to call for either estimate; the two may differ
+        assert batch_action == single_action, (hand, board)
@@ -0,0 +1,30 @@
+"""Tests for the multi-table manager's batch mode."""
+import asyncio
+
+import pytest
+
+import strategies
+from table_server import AsyncTableManager
+
+
+async def run_batched(tables, rounds):
+    manager = AsyncTableManager(batch=True)
+    return await asyncio.wait_for(manager.run(tables, rounds=rounds), timeout=30)
+
+
+def test_batch_mode_plays_every_table():
+    report = asyncio.run(run_batched(2, 2))
+    assert report['hands'] > 0
+    assert report['latency_ms']['batch']['count'] == report['decisions']
+
+
+def test_failing_decide_batch_reaches_the_tables(monkeypatch):
+    def decide_batch(self, game_states):
+        raise RuntimeError("strategy failed")
+
+    for strategy in (strategies.BaseStrategy, strategies.AggressiveStrategy, strategies.ConservativeStrategy,
+                     strategies.AllIn):
+        monkeypatch.setattr(strategy, 'decide_batch', decide_batch)
+
+    with pytest.raises(RuntimeError, match="strategy failed"):
+        asyncio.run(run_batched(2, 2))
@@ -0,0 +1,144 @@
+"""
+Parallel tournament runner.
+
+Plays many independent sessions of the standard bots across a process pool.
+Every session gets its own seed from one SeedSequence, so a run is
+reproducible whatever the number of workers. Per-bot results are merged
+into a single report with chip deltas, win rate, showdown frequency and
+bb/100 with its standard error.
+"""
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+
+import numpy as np
+
+from equity_cache import shared_cache
+from events import NullSink, PotWon, Showdown, Stacks
+from main import create_bots, run_texas_holdem
+
+BIG_BLIND = 10
+
+
+class BotRecord:
+    """Running per-bot totals that can be merged across sessions."""
+    def __init__(self):
+        self.hands = 0
+        self.won = 0
+        self.showdowns = 0
+        self.chips = 0
+        self.chips_squared = 0
+
+    def add_hand(self, delta):
+        self.hands += 1
+        self.chips += delta
+        self.chips_squared += delta * delta
+
+    def merge(self, other):
+        self.hands += other.hands
+        self.won += other.won
+        self.showdowns += other.showdowns
+        self.chips += other.chips
+        self.chips_squared += other.chips_squared
+
+    def win_rate(self):
+        return self.won / self.hands if self.hands else 0.0
+
+    def showdown_rate(self):
+        return self.showdowns / self.hands if self.hands else 0.0
+
+    def bb_per_100(self):
+        return 100 * self.chips / (self.hands * BIG_BLIND) if self.hands else 0.0
+
+    def bb_per_100_error(self):
+        """Standard error of bb/100, from the per-hand chip deltas."""
+        if self.hands < 2:
+            return 0.0
+        mean = self.chips / self.hands
+        variance = (self.chips_squared - self.hands * mean * mean) / (self.hands - 1)
+        return 100 * sqrt(max(variance, 0) / self.hands) / BIG_BLIND
+
+
+class SessionStats(NullSink):
+    """Event sink that turns a session's events into per-bot BotRecords."""
+    def __init__(self, starting_stacks):
+        self.stacks = dict(starting_stacks)
+        self.records = {name: BotRecord() for name in self.stacks}
+
+    def emit(self, event):
+        if isinstance(event, Stacks):
+            # Chip standings close every hand, so the difference is that hand's result
+            for name, stack in event.stacks:
+                self.records[name].add_hand(stack - self.stacks[name])
+                self.stacks[name] = stack
+        elif isinstance(event, PotWon):
+            self.records[event.name].won += 1
+        elif isinstance(event, Showdown):
+            for name in event.winners:
+                self.records[name].won += 1
+            for name in event.players:
+                self.records[name].showdowns += 1
+
+
+def play_session(seed_sequence, rounds):
+    """Plays one seeded session headless and returns its per-bot records."""
+    random.seed(int(seed_sequence.generate_state(1)[0]))
+    shared_cache.clear()  # Cached samples from other sessions would break reproducibility
+
+    bots = create_bots()
+    deck_seed, *bot_seeds = seed_sequence.spawn(len(bots) + 1)
+    for bot, bot_seed in zip(bots, bot_seeds):
+        bot.strategy.evaluator.rng = np.random.default_rng(bot_seed)
+
+    # The deal has its own stream, independent of the bots' random choices
+    deck_rng = random.Random(int(deck_seed.generate_state(1)[0]))
+
+    stats = SessionStats((bot.name, bot.stack) for bot in bots)
+    run_texas_holdem(rounds, sink=stats, bots=bots, rng=deck_rng)
+    return stats.records
+
+
+def _play_session(args):
+    return play_session(*args)
+
+
+def run_tournament(num_sessions=100, rounds=50, workers=None, seed=0):
+    """
+    Plays `num_sessions` sessions of up to `rounds` hands on `workers`
+    processes (all cores by default) and returns the merged {name: BotRecord}.
+    """
+    workers = workers or os.cpu_count()
+    seeds = np.random.SeedSequence(seed).spawn(num_sessions)
+    chunk_size = max(1, num_sessions // (4 * workers))
+    totals = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in pool.map(_play_session, [(session_seed, rounds) for session_seed in seeds],
+                                chunksize=chunk_size):
+            for name, record in records.items():
+                totals.setdefault(name, BotRecord()).merge(record)
+
+    return totals
+
+
+def format_report(totals):
+    """Formats merged results as a text table, best bb/100 first."""
+    lines = [f"{'Bot':<16}{'Hands':>9}{'Chips':>10}{'Win %':>8}{'SD %':>8}{'bb/100':>10}{'± SE':>9}"]
+    for name, record in sorted(totals.items(), key=lambda item: -item[1].bb_per_100()):
+        lines.append(f"{name:<16}{record.hands:>9}{record.chips:>10}{100 * record.win_rate():>8.1f}"
+                     f"{100 * record.showdown_rate():>8.1f}{record.bb_per_100():>10.1f}"
+                     f"{record.bb_per_100_error():>9.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many bot sessions in parallel.")
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=50, help="hands per session")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(format_report(run_tournament(args.sessions, args.rounds, args.workers, args.seed)))